@@ -0,0 +1,68 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+benchmarks of openbar
+
+each benchmark prints a table, or with -j a JSON document holding its
+results along with the versions they were measured with, so that runs
+may be compared across upgrades.
+"""
+
+import importlib
+import json
+import platform
+import socket
+import sys
+import time
+
+PACKAGES = ['bottle', 'cherrypy', 'jinja2', 'psycopg2']
+
+def environment():
+    """
+    describe the interpreter and the packages a benchmark ran with
+    """
+    versions = {}
+    for name in PACKAGES:
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            continue
+        versions[name] = getattr(module, '__version__', None)
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'host': socket.gethostname(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'packages': versions,
+    }
+
+def dump(name, results, output=sys.stdout):
+    """
+    write the results of a benchmark as a JSON document
+    """
+    json.dump({'benchmark': name,
+               'environment': environment(),
+               'results': results}, output, indent=2, sort_keys=True)
+    output.write('\n')
+
+def percentile(values, fraction):
+    """
+    nearest-rank percentile of sorted values
+    """
+    if not values:
+        return None
+    rank = max(0, min(len(values) - 1, int(round(fraction * len(values) + 0.5)) - 1))
+    return values[rank]
@@ -0,0 +1,151 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+closed-loop load generator against a running unit
+
+usage: python -m bench.load [-j] [-c clients] [-n requests | -t seconds]
+                            [-w warmup] url [path ...]
+
+each client keeps one connection open and sends the next request as soon
+as the previous one completed, cycling through the given paths. url may
+be http://host:port or unix:/path/to/socket as in the unit configuration.
+"""
+
+import getopt
+import sys
+import threading
+import time
+import urllib.parse
+
+import bench
+import openbar.client
+
+class _Client(threading.Thread):
+    def __init__(self, url, paths, until, count, warmup):
+        super(_Client, self).__init__(daemon=True)
+        self.url = url
+        self.prefix = ''
+        if not url.startswith('unix:'):
+            self.prefix = urllib.parse.urlsplit(url).path.rstrip('/')
+        self.paths = paths
+        self.until = until
+        self.count = count
+        self.warmup = warmup
+        self.latencies = []
+        self.errors = 0
+
+    def _request(self, path):
+        conn = openbar.client._connection(self.url)
+        try:
+            conn.request('GET', self.prefix + path)
+            response = conn.getresponse()
+            response.read()
+        except (ConnectionError, OSError):
+            conn.close()
+            return None
+        return response.status
+
+    def run(self):
+        start = time.monotonic()
+        i = 0
+        while True:
+            if self.count is not None and i >= self.count:
+                break
+            timer0 = time.monotonic()
+            if self.until is not None and timer0 >= self.until:
+                break
+            status = self._request(self.paths[i % len(self.paths)])
+            elapsed = time.monotonic() - timer0
+            i += 1
+            if timer0 - start < self.warmup:
+                continue
+            if status is None or status >= 400:
+                self.errors += 1
+            else:
+                self.latencies.append(elapsed)
+
+def run(url, paths, clients, requests=None, seconds=None, warmup=0.0):
+    """
+    load url with clients concurrent clients, for a number of requests per
+    client or a number of seconds, and return the throughput and latencies
+    """
+    until = None
+    if seconds is not None:
+        until = time.monotonic() + warmup + seconds
+    threads = [_Client(url, paths, until, requests, warmup) for _ in range(clients)]
+    timer0 = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.monotonic() - timer0 - warmup
+
+    latencies = sorted(latency for thread in threads for latency in thread.latencies)
+    errors = sum(thread.errors for thread in threads)
+    def _ms(value):
+        return None if value is None else value * 1000
+    return {
+        'url': url,
+        'paths': paths,
+        'clients': clients,
+        'requests': len(latencies),
+        'errors': errors,
+        'duration': duration,
+        'rps': len(latencies) / duration if duration > 0 else None,
+        'p50_ms': _ms(bench.percentile(latencies, .50)),
+        'p95_ms': _ms(bench.percentile(latencies, .95)),
+        'p99_ms': _ms(bench.percentile(latencies, .99)),
+        'max_ms': _ms(latencies[-1] if latencies else None),
+    }
+
+def main(argv):
+    opts, args = getopt.getopt(argv, "c:jn:t:w:")
+    as_json = False
+    clients = 8
+    requests = None
+    seconds = None
+    warmup = 0.0
+    for o, a in opts:
+        if o == '-c':
+            clients = int(a)
+        elif o == '-j':
+            as_json = True
+        elif o == '-n':
+            requests = int(a)
+        elif o == '-t':
+            seconds = float(a)
+        elif o == '-w':
+            warmup = float(a)
+    if not args:
+        sys.stderr.write(__doc__)
+        sys.exit(1)
+    if requests is None and seconds is None:
+        seconds = 10.0
+    url, paths = args[0], args[1:] or ['/']
+
+    result = run(url, paths, clients, requests, seconds, warmup)
+    if as_json:
+        bench.dump('load', result)
+    else:
+        print("%i requests, %i errors in %.2fs: %.1f req/s" % (
+            result['requests'], result['errors'], result['duration'], result['rps'] or 0))
+        if result['requests']:
+            print("latency ms: p50 %.2f p95 %.2f p99 %.2f max %.2f" % (
+                result['p50_ms'], result['p95_ms'], result['p99_ms'], result['max_ms']))
+    return result
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,121 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+micro-benchmarks of the request path
+
+usage: python -m bench.micro [-j] [-n iterations] [-r repeat] [name ...]
+"""
+
+import getopt
+import json as pyjson
+import os
+import sys
+import tempfile
+import time
+
+import bench
+import bench.routes
+import openbar.params
+import openbar.templates
+
+ROWS = [{'id': i, 'name': 'item%i' % i, 'value': i * 1.5, 'tags': ['a', 'b']}
+        for i in range(100)]
+
+TEMPLATE = """<ul>
+{% for row in rows %}<li id="{{ row.id }}">{{ row.name }}: {{ row.value }}</li>
+{% endfor %}</ul>
+"""
+
+def _params():
+    def _():
+        with openbar.params.Parameters({'name': 'foo', 'count': 42, 'ratio': 0.5,
+                                        'ids': list(range(20)),
+                                        'kind': 'b'}) as params:
+            params.string('name')
+            params.integer('count', minval=0, maxval=100)
+            params.float('ratio', minval=0, maxval=1)
+            params.integer_list('ids', maxlen=50)
+            params.string('kind', choice=('a', 'b', 'c'))
+    return _
+
+def _json():
+    return lambda: pyjson.dumps(ROWS)
+
+def _template():
+    path = tempfile.mkdtemp(prefix='openbar-bench-')
+    with open(os.path.join(path, 'bench.html'), 'w') as output:
+        output.write(TEMPLATE)
+    openbar.templates.set_path(path)
+    view = openbar.templates.render('bench.html')(lambda: {'rows': ROWS})
+    return view
+
+BENCHMARKS = {
+    'params': _params,
+    'json': _json,
+    'template': _template,
+}
+
+def measure(func, iterations, repeat):
+    """
+    return the best and median time of func in microseconds
+    """
+    timings = []
+    for _ in range(repeat):
+        timer0 = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        timings.append((time.perf_counter() - timer0) * 1e6 / iterations)
+    timings.sort()
+    return timings[0], timings[len(timings) // 2]
+
+def main(argv):
+    opts, args = getopt.getopt(argv, "jn:r:")
+    as_json = False
+    iterations = 2000
+    repeat = 5
+    for o, a in opts:
+        if o == '-j':
+            as_json = True
+        elif o == '-n':
+            iterations = int(a)
+        elif o == '-r':
+            repeat = int(a)
+    names = args or sorted(BENCHMARKS) + ['routes']
+
+    results = []
+    for name in names:
+        if name == 'routes':
+            for flat in (False, True):
+                timings = sorted(bench.routes.dispatch(100, flat, iterations)
+                                 for _ in range(repeat))
+                results.append({'name': 'routes.%s' % ('flat' if flat else 'mount'),
+                                'best_us': timings[0],
+                                'median_us': timings[len(timings) // 2]})
+            continue
+        best, median = measure(BENCHMARKS[name](), iterations, repeat)
+        results.append({'name': name, 'best_us': best, 'median_us': median})
+
+    if as_json:
+        bench.dump('micro', results)
+    else:
+        print("%-16s %12s %12s" % ("benchmark", "best us", "median us"))
+        for result in results:
+            print("%-16s %12.2f %12.2f" % (result['name'], result['best_us'],
+                                           result['median_us']))
+    return results
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
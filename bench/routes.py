@@ -0,0 +1,130 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+
+"""
+benchmark of request dispatch as the number of mounts grows
+
+usage: python -m bench.routes [-j] [-n requests] [mounts ...]
+"""
+
+import getopt
+import io
+import random
+import sys
+import time
+
+import bottle
+
+import bench
+import openbar.routes
+
+VERSIONS = ['1.0', '1.1', '1.2']
+
+def _setup(app):
+    @app.get('/')
+    def _list():
+        return 'list'
+
+    @app.post('/')
+    def _create():
+        return 'create'
+
+    @app.get('/<oid:int>')
+    def _get(oid):
+        return 'get'
+
+    @app.get('/<oid:int>/items/<item>')
+    def _item(oid, item):
+        return 'item'
+
+def register(mounts):
+    """
+    register routes for the given number of mounts, each version of a name
+    overriding the previous one
+    """
+    openbar.routes._ROUTES.clear()
+    paths = []
+    for i in range(mounts):
+        version = VERSIONS[i % len(VERSIONS)]
+        name = 'name%i' % (i // len(VERSIONS))
+        override = VERSIONS[:VERSIONS.index(version)][-1:]
+        openbar.routes.register(version, name, override=override)(_setup)
+        prefix = '/%s/%s' % (version, name)
+        paths.extend([('GET', prefix + '/'),
+                      ('POST', prefix + '/'),
+                      ('GET', prefix + '/42'),
+                      ('GET', prefix + '/42/items/foo')])
+    return paths
+
+def _environ(method, path):
+    return {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'SCRIPT_NAME': '',
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+    }
+
+def dispatch(mounts, flat, requests):
+    """
+    return the mean dispatch time in microseconds through the root application
+    """
+    paths = register(mounts)
+    root = bottle.Bottle()
+    root.catchall = False
+    app = openbar.routes.install_routes(root, flat=flat)
+
+    def start_response(status, headers, exc_info=None):
+        assert status.startswith('200'), status
+
+    rng = random.Random(mounts)
+    environs = [_environ(*rng.choice(paths)) for _ in range(requests)]
+    timer0 = time.perf_counter()
+    for environ in environs:
+        for _ in app(environ, start_response):
+            pass
+    return (time.perf_counter() - timer0) * 1e6 / requests
+
+def main(argv):
+    opts, args = getopt.getopt(argv, "jn:")
+    as_json = False
+    requests = 20000
+    for o, a in opts:
+        if o == '-j':
+            as_json = True
+        elif o == '-n':
+            requests = int(a)
+    sizes = [int(_) for _ in args] or [10, 100, 300, 1000]
+
+    results = []
+    if not as_json:
+        print("%8s %12s %12s" % ("mounts", "mount us/req", "flat us/req"))
+    for mounts in sizes:
+        mount = dispatch(mounts, False, requests)
+        flat = dispatch(mounts, True, requests)
+        if not as_json:
+            print("%8i %12.2f %12.2f" % (mounts, mount, flat))
+        results.append({'mounts': mounts, 'mount_us': mount, 'flat_us': flat})
+    if as_json:
+        bench.dump('routes', results)
+    return results
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
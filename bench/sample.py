@@ -0,0 +1,132 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+sample backend unit for load tests
+
+the items are kept in PostgreSQL when the configuration has a database
+section, in memory otherwise. Run it with packages = bench.sample, see
+bench/openbar.conf.
+"""
+
+import threading
+
+import bottle
+
+import openbar.config
+import openbar.params
+import openbar.routes
+
+ITEMS = 1000
+
+class _MemoryStore(object):
+    """
+    in-memory stand-in for the database
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.items = {}
+        for oid in range(1, ITEMS + 1):
+            self.items[oid] = {'id': oid, 'name': 'item%i' % oid, 'value': oid}
+
+    def list(self, offset, limit):
+        with self.lock:
+            oids = sorted(self.items)[offset:offset + limit]
+            return [self.items[oid] for oid in oids]
+
+    def get(self, oid):
+        with self.lock:
+            return self.items.get(oid)
+
+    def create(self, name, value):
+        with self.lock:
+            oid = max(self.items, default=0) + 1
+            self.items[oid] = {'id': oid, 'name': name, 'value': value}
+            return self.items[oid]
+
+
+class _PgStore(object):
+    """
+    items kept in the bench_items table of the configured database
+    """
+    def __init__(self):
+        import openbar.db
+        self.connector = lambda: openbar.db.connector('database', openbar.db.Connected)
+        with self.connector() as db:
+            with db as cursor:
+                cursor.execute("CREATE TABLE IF NOT EXISTS bench_items "
+                               "(id SERIAL PRIMARY KEY, name TEXT NOT NULL, value INTEGER NOT NULL)")
+                cursor.execute("SELECT count(*) AS count FROM bench_items")
+                if cursor.fetchone()['count'] == 0:
+                    cursor.execute("INSERT INTO bench_items (name, value) "
+                                   "SELECT 'item' || i, i FROM generate_series(1, %s) AS i",
+                                   (ITEMS, ))
+
+    def list(self, offset, limit):
+        with self.connector() as db:
+            with db as cursor:
+                cursor.execute("SELECT id, name, value FROM bench_items "
+                               "ORDER BY id OFFSET %s LIMIT %s", (offset, limit))
+                return cursor.fetchall()
+
+    def get(self, oid):
+        with self.connector() as db:
+            with db as cursor:
+                cursor.execute("SELECT id, name, value FROM bench_items WHERE id = %s", (oid, ))
+                return cursor.fetchone()
+
+    def create(self, name, value):
+        with self.connector() as db:
+            with db as cursor:
+                cursor.execute("INSERT INTO bench_items (name, value) VALUES (%s, %s) "
+                               "RETURNING id, name, value", (name, value))
+                return cursor.fetchone()
+
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+def _store():
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            if openbar.config.get('database') is not None:
+                _STORE = _PgStore()
+            else:
+                _STORE = _MemoryStore()
+        return _STORE
+
+@openbar.routes.register('1.0', 'items')
+def _setup(app):
+
+    @app.get('/')
+    def _list():
+        offset = int(bottle.request.query.get('offset', 0))
+        limit = min(100, int(bottle.request.query.get('limit', 20)))
+        return {'items': _store().list(offset, limit)}
+
+    @app.get('/<oid:int>')
+    def _get(oid):
+        item = _store().get(oid)
+        if item is None:
+            openbar.params.error(404)
+        return item
+
+    @app.post('/')
+    def _create():
+        with openbar.params.json() as params:
+            name = params.string('name')
+            value = params.integer('value', minval=0)
+        return _store().create(name, value)
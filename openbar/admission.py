@@ -0,0 +1,185 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+
+"""
+admission control and load shedding per mount
+"""
+
+import json as pyjson
+import threading
+import time
+
+import openbar.routes
+
+CRITICAL = 'critical'
+NORMAL = 'normal'
+LOW = 'low'
+
+LIMIT = 0
+QUEUE = 0
+QUEUE_TIMEOUT = 1.0
+RETRY_AFTER = 1
+
+_GATES = {}
+_GATES_LOCK = threading.Lock()
+
+def configure(limit, queue, queue_timeout, retry_after):
+    """
+    set the default concurrency limit per mount, 0 disables admission control
+    """
+    global LIMIT, QUEUE, QUEUE_TIMEOUT, RETRY_AFTER
+    LIMIT = limit
+    QUEUE = queue
+    QUEUE_TIMEOUT = queue_timeout
+    RETRY_AFTER = retry_after
+
+
+class _Gate(object):
+    """
+    concurrency limit with a bounded wait queue
+    """
+    def __init__(self, limit, queue):
+        self.limit = limit
+        self.queue = queue
+        self.cond = threading.Condition()
+        self.inflight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = 0
+
+    def enter(self, timeout, may_wait=True):
+        with self.cond:
+            if self.inflight < self.limit:
+                self.inflight += 1
+                self.admitted += 1
+                return True
+            if not may_wait or self.waiting >= self.queue:
+                self.shed += 1
+                return False
+
+            self.waiting += 1
+            try:
+                deadline = time.monotonic() + timeout
+                while self.inflight >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.shed += 1
+                        return False
+                    self.cond.wait(remaining)
+                self.inflight += 1
+                self.admitted += 1
+                return True
+            finally:
+                self.waiting -= 1
+
+    def leave(self):
+        with self.cond:
+            self.inflight -= 1
+            self.cond.notify()
+
+    def stats(self):
+        with self.cond:
+            return {'limit': self.limit, 'queue': self.queue,
+                    'inflight': self.inflight, 'waiting': self.waiting,
+                    'admitted': self.admitted, 'shed': self.shed}
+
+def _gate(version, name):
+    gate = _GATES.get((version, name))
+    if gate is not None:
+        return gate
+    options = openbar.routes.options(version, name)
+    if options is None:
+        return None
+    with _GATES_LOCK:
+        gate = _GATES.get((version, name))
+        if gate is None:
+            limit = options.get('concurrency') or LIMIT
+            queue = QUEUE if options.get('queue') is None else options['queue']
+            gate = _GATES[(version, name)] = _Gate(limit, queue)
+        return gate
+
+def stats():
+    """
+    current in-flight and queued requests per mount
+    """
+    return dict(('/%s/%s/' % key, gate.stats()) for (key, gate) in sorted(_GATES.items()))
+
+
+class _Release(object):
+    """
+    response body releasing its admission slot once sent
+    """
+    def __init__(self, body, gate):
+        self.body = body
+        self.gate = gate
+
+    def __iter__(self):
+        return iter(self.body)
+
+    def close(self):
+        try:
+            if hasattr(self.body, 'close'):
+                self.body.close()
+        finally:
+            gate, self.gate = self.gate, None
+            if gate is not None:
+                gate.leave()
+
+
+class AdmissionMiddleware(object):
+    """
+    limit concurrent requests per /<version>/<name>/ mount
+
+    requests over the limit wait in a bounded queue, then are answered with
+    a 503 as soon as the queue is full or their wait times out. Mounts
+    registered with the critical priority are never limited, low priority
+    ones are shed instead of waiting.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    def __call__(self, environ, start_response):
+        parts = environ.get('PATH_INFO', '').split('/', 3)
+        if len(parts) < 4:
+            return self.app(environ, start_response)
+
+        version, name = parts[1], parts[2]
+        options = openbar.routes.options(version, name) or {}
+        priority = options.get('priority') or NORMAL
+        if priority == CRITICAL or not (options.get('concurrency') or LIMIT):
+            return self.app(environ, start_response)
+
+        gate = _gate(version, name)
+        if gate is None:
+            return self.app(environ, start_response)
+        if not gate.enter(QUEUE_TIMEOUT, may_wait=priority != LOW):
+            environ.setdefault('openbar.log', {})['shed'] = 1
+            body = pyjson.dumps({'error': 'Service Unavailable'}).encode('utf-8')
+            start_response('503 Service Unavailable', [
+                ('Content-Type', 'application/json'),
+                ('Content-Length', str(len(body))),
+                ('Retry-After', str(RETRY_AFTER)),
+            ])
+            return [body]
+
+        try:
+            return _Release(self.app(environ, start_response), gate)
+        except:
+            gate.leave()
+            raise
+
+def install_stats(root, path='/admission'):
+    root.route(path, method='GET', callback=stats)
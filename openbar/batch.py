@@ -0,0 +1,166 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+batch endpoint dispatching several sub-requests in a single round trip
+"""
+
+import concurrent.futures
+import io
+import threading
+
+import bottle
+
+import openbar.deadline
+import openbar.params
+import openbar.trace
+import openbar.wire
+
+BATCH_PATH = '/batch'
+MAX_REQUESTS = 50
+
+_WORKERS = 4
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+def set_workers(count):
+    global _WORKERS
+    _WORKERS = max(1, int(count))
+
+def _executor():
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=_WORKERS)
+        return _EXECUTOR
+
+def _validate(sub):
+    if not isinstance(sub, dict):
+        raise TypeError('expect object')
+    if not isinstance(sub.get('method', 'GET'), str):
+        raise TypeError('expect string method')
+    path = sub.get('path')
+    if not isinstance(path, str) or not path.startswith('/'):
+        raise ValueError('expect absolute path')
+    if path.split('?')[0].rstrip('/') == BATCH_PATH:
+        raise ValueError('nested batch')
+
+def _parallel(value):
+    if isinstance(value, bool):
+        return
+    if not isinstance(value, int):
+        raise TypeError('expect boolean or integer')
+    if not 1 <= value <= MAX_REQUESTS:
+        raise ValueError('out of range')
+
+def _environ(environ, sub, remaining):
+    path, _, query = sub['path'].partition('?')
+    body = b''
+    if sub.get('body') is not None:
+        body = openbar.wire.dumps(sub['body'])
+
+    # bottle caches parsed request data in the environ, it must not leak
+    # from the batch request into its sub-requests
+    env = dict((key, value) for (key, value) in environ.items()
+               if not key.startswith('bottle.'))
+    env.update({
+        'REQUEST_METHOD': sub.get('method', 'GET').upper(),
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path.encode('utf-8').decode('latin1'),
+        'QUERY_STRING': query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': io.BytesIO(body),
+    })
+    # sub-requests run on the executor, the deadline of the batch is handed
+    # over the same way a caller would
+    if remaining is not None:
+        env['HTTP_X_OPENBAR_TIMEOUT'] = '%.3f' % remaining
+    traceparent = openbar.trace.header()
+    if traceparent is not None:
+        env['HTTP_TRACEPARENT'] = traceparent
+    return env
+
+def _dispatch(app, environ):
+    result = {}
+    chunks = []
+    def start_response(status, headers, exc_info=None):
+        result['status'] = int(status.split()[0])
+        result['headers'] = dict(headers)
+        return chunks.append
+
+    context = openbar.trace.begin(environ)
+    try:
+        body = app(environ, start_response)
+        try:
+            for chunk in body:
+                chunks.append(chunk)
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+    finally:
+        openbar.trace.end(context, result.get('status'))
+
+    data = b''.join(chunks)
+    content_type = result.pop('headers').get('Content-Type', '')
+    if content_type.startswith(openbar.wire.JSON) or openbar.wire.is_msgpack(content_type):
+        result['body'] = openbar.wire.loads(data, content_type) if data else None
+    else:
+        result['body'] = data.decode('utf-8', 'replace')
+    return result
+
+def install_batch(root, target=None):
+    """
+    install the batch endpoint on the root application
+
+    sub-requests are dispatched to the mounted applications in-process, on
+    the batch executor so they never clobber the thread-local request of the
+    batch itself, and their responses are returned in order. They go through
+    target, a wsgi application wrapping root, when given.
+    """
+    if target is None:
+        target = root
+
+    def batch():
+        with openbar.params.json() as params:
+            requests = params.any_list('requests', validate=_validate,
+                                       maxlen=MAX_REQUESTS)
+            parallel = params.any('parallel', False, validate=_parallel)
+
+        # parallel is true or the count of sub-requests run at once
+        width = 1
+        if parallel is True:
+            width = len(requests)
+        elif parallel:
+            width = parallel
+
+        environ = bottle.request.environ
+        executor = _executor()
+        responses = []
+        for i in range(0, len(requests), max(1, width)):
+            chunk = requests[i:i + width]
+            remaining = openbar.deadline.remaining()
+            if remaining is not None and remaining <= 0:
+                # sub-requests left past the deadline of the batch are not run
+                openbar.deadline.miss()
+                responses.extend({'status': 504, 'body': {'error': 'Gateway Timeout'}}
+                                 for _ in chunk)
+                continue
+            futures = [executor.submit(_dispatch, target, _environ(environ, sub, remaining))
+                       for sub in chunk]
+            responses.extend(future.result() for future in futures)
+        return {'responses': responses}
+
+    root.route(BATCH_PATH, method='POST', callback=batch)
@@ -0,0 +1,343 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+cache shared by the processes of a host through a memory-mapped file
+
+the file holds a fixed number of fixed-size slots split into stripes,
+each stripe guarded by its own lock so that unrelated keys do not
+contend. A key lives in a short window of slots of its stripe, when the
+window is full the clock algorithm evicts the first entry that was not
+read since the hand last went over it. The file outlives the processes
+using it, so a restarted unit finds the cache warm.
+
+    fragments = openbar.cache.open('/var/cache/openbar/fragments', slots=65536)
+    html = fragments.get('sidebar')
+    if html is None:
+        html = render_sidebar()
+        fragments.set('sidebar', html, ttl=60)
+"""
+
+import fcntl
+import hashlib
+import json as pyjson
+import mmap
+import os
+import struct
+import threading
+import time
+
+import openbar.exceptions
+
+MAGIC = b'OBC1'
+PROBE = 8
+
+_HEADER = struct.Struct('<4sIIII')
+_HEADER_SIZE = 64
+# hits, misses, sets, evictions, expired, used, hand
+_STRIPE = struct.Struct('<7Q')
+_STRIPE_SIZE = 64
+# state, referenced, kind, key length, value length, hash, expiry
+_SLOT = struct.Struct('<BBBxHIQd')
+
+_EMPTY, _USED, _DELETED = 0, 1, 2
+_BYTES, _STR, _JSON = 0, 1, 2
+
+_MISSING = object()
+
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+def _hash(key):
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little')
+
+def _key(key):
+    if isinstance(key, str):
+        key = key.encode('utf-8')
+    if not isinstance(key, bytes):
+        raise TypeError('expect str or bytes key')
+    return key
+
+
+class _StripeLock(object):
+    """
+    lock of a stripe across the threads and the processes using the file
+
+    record locks are owned by processes, the thread lock serializes the
+    threads of a process before they take the record lock.
+    """
+    def __init__(self, fd, index):
+        self.fd = fd
+        self.index = index
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        self.lock.acquire()
+        try:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, 1, self.index)
+        except:
+            self.lock.release()
+            raise
+
+    def __exit__(self, type_, value, traceback):
+        try:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN, 1, self.index)
+        finally:
+            self.lock.release()
+
+
+class Cache(object):
+    """
+    fixed-size hash table in a memory-mapped file
+    """
+    def __init__(self, path, slots, slot_size, stripes):
+        self.path = path
+        self.stripes = stripes
+        self.per_stripe = max(PROBE, slots // stripes)
+        self.slots = self.per_stripe * stripes
+        self.slot_size = slot_size
+        self.size = _HEADER_SIZE + stripes * _STRIPE_SIZE + self.slots * slot_size
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            self._init()
+            self.mm = mmap.mmap(self.fd, self.size)
+        except:
+            os.close(self.fd)
+            raise
+        self.locks = [_StripeLock(self.fd, i) for i in range(stripes)]
+
+    def _init(self):
+        header = _HEADER.pack(MAGIC, 1, self.slots, self.slot_size, self.stripes)
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            existing = os.pread(self.fd, _HEADER.size, 0)
+            if existing == header and os.fstat(self.fd).st_size == self.size:
+                return
+            if existing[:4] == MAGIC:
+                raise openbar.exceptions.InvalidConfiguration(
+                    "%s: cache file has a different geometry" % (self.path, ))
+            os.ftruncate(self.fd, 0)
+            os.ftruncate(self.fd, self.size)
+            os.pwrite(self.fd, header, 0)
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def _stripe(self, index):
+        return _HEADER_SIZE + index * _STRIPE_SIZE
+
+    def _count(self, stripe, field, delta=1):
+        offset = self._stripe(stripe) + field * 8
+        value, = struct.unpack_from('<Q', self.mm, offset)
+        struct.pack_into('<Q', self.mm, offset, max(0, value + delta))
+
+    def _slot(self, stripe, index):
+        return (_HEADER_SIZE + self.stripes * _STRIPE_SIZE +
+                (stripe * self.per_stripe + index % self.per_stripe) * self.slot_size)
+
+    def _locate(self, key):
+        digest = _hash(key)
+        stripe = digest % self.stripes
+        return digest, stripe, (digest // self.stripes) % self.per_stripe
+
+    def _find(self, key, digest, stripe, first):
+        """
+        offset of the slot holding key in its window, None if absent
+        """
+        now = time.time()
+        for i in range(PROBE):
+            offset = self._slot(stripe, first + i)
+            state, _, _, klen, _, hashed, expires = _SLOT.unpack_from(self.mm, offset)
+            if state == _EMPTY:
+                return None
+            if state != _USED or hashed != digest:
+                continue
+            start = offset + _SLOT.size
+            if self.mm[start:start + klen] != key:
+                continue
+            if expires and expires <= now:
+                self.mm[offset] = _DELETED
+                self._count(stripe, 4)
+                self._count(stripe, 5, -1)
+                return None
+            return offset
+        return None
+
+    def _victim(self, stripe, first):
+        """
+        slot of the window to store a new entry in, evicting if needed
+        """
+        now = time.time()
+        for i in range(PROBE):
+            offset = self._slot(stripe, first + i)
+            state, _, _, _, _, _, expires = _SLOT.unpack_from(self.mm, offset)
+            if state != _USED:
+                return offset, False
+            if expires and expires <= now:
+                self._count(stripe, 4)
+                return offset, True
+
+        # second chance, the hand clears reference bits until it finds an
+        # entry that was not read since its last pass
+        hand, = struct.unpack_from('<Q', self.mm, self._stripe(stripe) + 48)
+        for i in range(2 * PROBE):
+            offset = self._slot(stripe, first + (hand + i) % PROBE)
+            if self.mm[offset + 1]:
+                self.mm[offset + 1] = 0
+                continue
+            struct.pack_into('<Q', self.mm, self._stripe(stripe) + 48, hand + i + 1)
+            self._count(stripe, 3)
+            return offset, True
+        return self._slot(stripe, first + hand % PROBE), True
+
+    def _get(self, key):
+        key = _key(key)
+        digest, stripe, first = self._locate(key)
+        with self.locks[stripe]:
+            offset = self._find(key, digest, stripe, first)
+            if offset is None:
+                self._count(stripe, 1)
+                return None, None
+            _, _, kind, klen, vlen, _, _ = _SLOT.unpack_from(self.mm, offset)
+            self.mm[offset + 1] = 1
+            self._count(stripe, 0)
+            start = offset + _SLOT.size + klen
+            return kind, self.mm[start:start + vlen]
+
+    def get(self, key, default=None):
+        """
+        value of key, default if it is absent or expired
+        """
+        kind, value = self._get(key)
+        if kind is None:
+            return default
+        if kind == _STR:
+            return value.decode('utf-8')
+        if kind == _JSON:
+            return pyjson.loads(value.decode('utf-8'))
+        return value
+
+    def _set(self, key, kind, value, ttl):
+        key = _key(key)
+        if _SLOT.size + len(key) + len(value) > self.slot_size:
+            return False
+        digest, stripe, first = self._locate(key)
+        expires = time.time() + ttl if ttl else 0.0
+        with self.locks[stripe]:
+            offset = self._find(key, digest, stripe, first)
+            if offset is None:
+                offset, replaced = self._victim(stripe, first)
+                if not replaced:
+                    self._count(stripe, 5)
+            start = offset + _SLOT.size
+            self.mm[start:start + len(key)] = key
+            self.mm[start + len(key):start + len(key) + len(value)] = value
+            _SLOT.pack_into(self.mm, offset, _USED, 0, kind, len(key), len(value),
+                            digest, expires)
+            self._count(stripe, 2)
+        return True
+
+    def set(self, key, value, ttl=None):
+        """
+        store value, bytes or str, for ttl seconds or until evicted, return
+        False if it does not fit in a slot
+        """
+        if isinstance(value, str):
+            return self._set(key, _STR, value.encode('utf-8'), ttl)
+        if not isinstance(value, bytes):
+            raise TypeError('expect str or bytes value')
+        return self._set(key, _BYTES, value, ttl)
+
+    def set_json(self, key, value, ttl=None):
+        """
+        store a JSON serializable value, returned as is by get()
+        """
+        return self._set(key, _JSON, pyjson.dumps(value).encode('utf-8'), ttl)
+
+    def get_or_set(self, key, compute, ttl=None):
+        """
+        value of key, computed and stored if it is absent
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = compute()
+        if isinstance(value, (str, bytes)):
+            self.set(key, value, ttl)
+        else:
+            self.set_json(key, value, ttl)
+        return value
+
+    def delete(self, key):
+        key = _key(key)
+        digest, stripe, first = self._locate(key)
+        with self.locks[stripe]:
+            offset = self._find(key, digest, stripe, first)
+            if offset is None:
+                return False
+            self.mm[offset] = _DELETED
+            self._count(stripe, 5, -1)
+            return True
+
+    def clear(self):
+        for stripe in range(self.stripes):
+            with self.locks[stripe]:
+                first = self._slot(stripe, 0)
+                for i in range(self.per_stripe):
+                    self.mm[first + i * self.slot_size] = _EMPTY
+                self.mm[self._stripe(stripe):self._stripe(stripe) + _STRIPE.size] = \
+                    bytes(_STRIPE.size)
+
+    def stats(self):
+        """
+        hit rate, evictions and usage summed over the stripes
+        """
+        totals = [0] * 6
+        for stripe in range(self.stripes):
+            with self.locks[stripe]:
+                counters = _STRIPE.unpack_from(self.mm, self._stripe(stripe))
+            totals = [total + counter for total, counter in zip(totals, counters[:6])]
+        hits, misses, sets, evictions, expired, used = totals
+        lookups = hits + misses
+        return {'path': self.path, 'slots': self.slots, 'slot_size': self.slot_size,
+                'used': used, 'hits': hits, 'misses': misses,
+                'hit_rate': hits / lookups if lookups else None,
+                'sets': sets, 'evictions': evictions, 'expired': expired}
+
+    def close(self):
+        self.mm.close()
+        os.close(self.fd)
+
+def open(path, slots=4096, slot_size=1024, stripes=16):
+    """
+    open the cache stored in path, created with the given geometry if it
+    does not exist, opening the same path twice returns the same cache
+    """
+    path = os.path.abspath(path)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(path)
+        if cache is None:
+            cache = _CACHES[path] = Cache(path, slots, slot_size, stripes)
+        return cache
+
+def stats():
+    """
+    statistics of the caches opened by this process
+    """
+    with _CACHES_LOCK:
+        caches = list(_CACHES.values())
+    return dict((cache.path, cache.stats()) for cache in caches)
+
+def install_stats(root, path='/cache'):
+    root.route(path, method='GET', callback=stats)
@@ -0,0 +1,273 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+client interface for frontends calling their backend
+"""
+
+import http.client
+import socket
+import threading
+import urllib.parse
+
+import openbar.deadline
+import openbar.exceptions
+import openbar.trace
+import openbar.wire
+
+BACKEND = None
+WIRE = openbar.wire.JSON
+BATCH_PATH = '/batch'
+
+# methods that may be sent again when a keep-alive connection went stale
+_IDEMPOTENT = frozenset(['GET', 'HEAD', 'OPTIONS'])
+
+_LOCAL = threading.local()
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """
+    HTTP connection to a backend listening on a unix socket
+    """
+    def __init__(self, path):
+        super(_UnixHTTPConnection, self).__init__('localhost')
+        self.unix_path = path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            if self.timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
+                sock.settimeout(self.timeout)
+            sock.connect(self.unix_path)
+        except:
+            sock.close()
+            raise
+        self.sock = sock
+
+def set_backend(url):
+    global BACKEND
+    BACKEND = url
+
+def set_wire(wire):
+    """
+    format of the requests to the backend, json or msgpack
+    """
+    global WIRE
+    if wire == 'msgpack':
+        if not openbar.wire.available():
+            raise openbar.exceptions.InvalidConfiguration("wire msgpack needs the msgpack package")
+        WIRE = openbar.wire.MSGPACK
+    else:
+        WIRE = openbar.wire.JSON
+
+def _connection(url):
+    """
+    per-thread keep-alive connection to the backend
+    """
+    connections = getattr(_LOCAL, 'connections', None)
+    if connections is None:
+        connections = _LOCAL.connections = {}
+    conn = connections.get(url)
+    if conn is None:
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.scheme == 'unix':
+            conn = _UnixHTTPConnection(parsed.path)
+        elif parsed.scheme == 'https':
+            conn = http.client.HTTPSConnection(parsed.netloc)
+        else:
+            conn = http.client.HTTPConnection(parsed.netloc)
+        connections[url] = conn
+    return conn
+
+def _set_timeout(conn, timeout):
+    # applies to the connection being opened and to an open one alike
+    conn.timeout = timeout
+    if conn.sock is not None:
+        conn.sock.settimeout(timeout)
+
+def _discard(url, conn):
+    conn.close()
+    connections = getattr(_LOCAL, 'connections', {})
+    if connections.get(url) is conn:
+        del connections[url]
+
+def _send(conn, method, url, body, headers):
+    conn.request(method, url, body, headers)
+    response = conn.getresponse()
+    return response, response.read()
+
+def _request(method, path, data=None, idempotent=None):
+    if BACKEND is None:
+        raise openbar.exceptions.InvalidConfiguration("no backend configured")
+
+    prefix = ''
+    if not BACKEND.startswith('unix:'):
+        prefix = urllib.parse.urlsplit(BACKEND).path.rstrip('/')
+    headers = {'Accept': WIRE}
+    body = None
+    if data is not None:
+        body = openbar.wire.dumps(data, WIRE)
+        headers['Content-Type'] = WIRE
+    remaining = openbar.deadline.remaining()
+    if remaining is not None:
+        # the backend gets what is left of our own deadline
+        openbar.deadline.check()
+        headers[openbar.deadline.HEADER] = '%.3f' % remaining
+
+    conn = _connection(BACKEND)
+    _set_timeout(conn, remaining)
+    with openbar.trace.span('backend %s' % method, 'CLIENT', **{'http.path': path}) as span:
+        traceparent = openbar.trace.header()
+        if traceparent is not None:
+            headers[openbar.trace.HEADER] = traceparent
+        try:
+            try:
+                response, payload = _send(conn, method, prefix + path, body, headers)
+            except ConnectionError:
+                # stale keep-alive connection, retry once on a fresh one unless
+                # the request may have been processed
+                conn.close()
+                if not (method in _IDEMPOTENT if idempotent is None else idempotent):
+                    raise
+                response, payload = _send(conn, method, prefix + path, body, headers)
+        except socket.timeout as exc:
+            _discard(BACKEND, conn)
+            if remaining is None:
+                raise
+            openbar.deadline.miss()
+            raise openbar.exceptions.DeadlineExceeded(
+                "deadline exceeded waiting for backend %s %s" % (method, path)) from exc
+        except Exception:
+            # a connection failing mid-exchange is left in a state where it
+            # refuses further requests, the next call opens a new one
+            _discard(BACKEND, conn)
+            raise
+        span.tag('http.status_code', response.status)
+
+    result = None
+    content_type = response.getheader('Content-Type', '')
+    if payload and (content_type.startswith(openbar.wire.JSON) or
+                    openbar.wire.is_msgpack(content_type)):
+        result = openbar.wire.loads(payload, content_type)
+    elif payload:
+        result = payload.decode('utf-8', 'replace')
+    return response.status, result
+
+def _result(status, data):
+    if status >= 400:
+        raise openbar.exceptions.BackendError(status, data)
+    return data
+
+def call(method, path, data=None):
+    batch = getattr(_LOCAL, 'batch', None)
+    if batch is not None:
+        return batch.call(method, path, data)
+    return _result(*_request(method, path, data))
+
+def get(path):
+    return call('GET', path)
+
+def post(path, data=None):
+    return call('POST', path, data)
+
+def put(path, data=None):
+    return call('PUT', path, data)
+
+def delete(path, data=None):
+    return call('DELETE', path, data)
+
+
+class Pending(object):
+    """
+    placeholder for the result of a call queued in a batch
+    """
+    def __init__(self, batch):
+        self._batch = batch
+        self._status = None
+        self._data = None
+        self._error = None
+
+    def _resolve(self, status, data):
+        self._status = status
+        self._data = data
+
+    def _fail(self, error):
+        self._error = error
+
+    @property
+    def result(self):
+        if self._status is None and self._error is None:
+            self._batch.flush()
+        if self._error is not None:
+            raise self._error
+        return _result(self._status, self._data)
+
+
+class Batch(object):
+    """
+    gather the backend calls made within a block and send them as one request
+
+    calls made through this module while the block is active return Pending
+    placeholders, the batch is sent when the block exits or as soon as one of
+    the placeholders is resolved. parallel is True to run the calls at once on
+    the backend, or the number of calls it may run at once.
+    """
+    def __init__(self, parallel=False):
+        self.parallel = parallel
+        self.queued = []
+        self.previous = None
+
+    def __enter__(self):
+        self.previous = getattr(_LOCAL, 'batch', None)
+        _LOCAL.batch = self
+        return self
+
+    def __exit__(self, type_, value, traceback):
+        _LOCAL.batch = self.previous
+        if (type_, value, traceback) == (None, None, None):
+            self.flush()
+
+    def call(self, method, path, data=None):
+        pending = Pending(self)
+        self.queued.append((pending, {'method': method, 'path': path, 'body': data}))
+        return pending
+
+    def flush(self):
+        queued, self.queued = self.queued, []
+        if not queued:
+            return
+        try:
+            if len(queued) == 1:
+                pending, sub = queued[0]
+                pending._resolve(*_request(sub['method'], sub['path'], sub['body']))
+                return
+            data = _result(*_request('POST', BATCH_PATH, {
+                'requests': [sub for (_, sub) in queued],
+                'parallel': self.parallel,
+            }, idempotent=all(sub['method'] in _IDEMPOTENT for (_, sub) in queued)))
+            responses = data['responses']
+            if len(responses) != len(queued):
+                raise openbar.exceptions.BackendError(502, {
+                    'error': 'batch answered %i of %i requests' % (len(responses), len(queued))})
+            for (pending, _), response in zip(queued, responses):
+                pending._resolve(response['status'], response['body'])
+        except Exception as exc:
+            # calls of a failed batch fail with it instead of staying pending
+            for pending, _ in queued:
+                if pending._status is None:
+                    pending._fail(exc)
+            raise
+
+def batch(parallel=False):
+    return Batch(parallel)
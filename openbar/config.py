@@ -16,6 +16,9 @@
 import configparser
 
 import openbar.exceptions
+import openbar.listen
+import openbar.trace
+import openbar.wire
 
 _CONFIGFILE = None
 _CONFIG = {}
@@ -49,33 +52,152 @@ def parse(filename):
             raise openbar.exceptions.InvalidConfiguration("unknown section type %s for section %s in configuration file: %s" % (type_, section, filename))
 
 
+def parse_int(filename, type_, config, tmp, key, default):
+    try:
+        tmp[key] = config.getint(key, default)
+    except ValueError:
+        raise openbar.exceptions.InvalidConfiguration("%s: in section '%s': invalid %s '%s'" % (filename, type_, key, config.get(key)))
+
+
+def parse_float(filename, type_, config, tmp, key, default):
+    try:
+        tmp[key] = config.getfloat(key, default)
+    except ValueError:
+        raise openbar.exceptions.InvalidConfiguration("%s: in section '%s': invalid %s '%s'" % (filename, type_, key, config.get(key)))
+
+
+def parse_choice(filename, type_, config, tmp, key, choices):
+    value = config.get(key, choices[0])
+    if value not in choices:
+        raise openbar.exceptions.InvalidConfiguration("%s: in section '%s': invalid %s '%s'" % (filename, type_, key, value))
+    tmp[key] = value
+
+
+def parse_lazy(filename, type_, config, tmp):
+    lazy = {}
+    for entry in config.get('lazy', '').split():
+        mount, _, module = entry.partition(':')
+        version, _, name = mount.partition('/')
+        if not (version and name and module) or '/' in name:
+            raise openbar.exceptions.InvalidConfiguration("%s: in section '%s': invalid lazy entry '%s', expect version/name:module" % (filename, type_, entry))
+        lazy[(version, name)] = module
+    tmp['lazy'] = lazy
+    parse_choice(filename, type_, config, tmp, 'preload', ['no', 'yes'])
+
+
+def parse_listen(filename, type_, config, tmp):
+    listen = config.get('listen')
+    if listen is None:
+        for key in ['host', 'port']:
+            if config.get(key) is None:
+                raise openbar.exceptions.InvalidConfiguration("%s: in section '%s': missing key '%s'" % (filename, type_, key))
+            tmp[key] = config.get(key)
+        try:
+            port = config.getint('port')
+        except ValueError:
+            raise openbar.exceptions.InvalidConfiguration("%s: in section '%s': invalid port number '%s'" % (filename, type_, config.get('port')))
+        tmp['port'] = port
+        return
+
+    try:
+        openbar.listen.parse(listen)
+    except ValueError as exc:
+        raise openbar.exceptions.InvalidConfiguration("%s: in section '%s': %s" % (filename, type_, exc))
+    tmp['listen'] = listen
+    tmp['host'] = None
+    tmp['port'] = None
+
+    try:
+        tmp['listen_mode'] = int(config.get('listen_mode', '0660'), 8)
+    except ValueError:
+        raise openbar.exceptions.InvalidConfiguration("%s: in section '%s': invalid listen_mode '%s'" % (filename, type_, config.get('listen_mode')))
+    tmp['listen_group'] = config.get('listen_group')
+
+
+def parse_admin(filename, type_, config, tmp):
+    prefix = config.get('admin_prefix')
+    if prefix is not None and not (prefix.startswith('/') and prefix.strip('/')):
+        raise openbar.exceptions.InvalidConfiguration("%s: in section '%s': invalid admin_prefix '%s'" % (filename, type_, prefix))
+    tmp['admin_prefix'] = prefix
+
+
+def parse_trace(filename, type_, config, tmp):
+    parse_float(filename, type_, config, tmp, 'trace_sample', 0.0)
+    try:
+        openbar.trace.parse_export(config.get('trace_export'))
+    except ValueError as exc:
+        raise openbar.exceptions.InvalidConfiguration("%s: in section '%s': %s" % (filename, type_, exc))
+    tmp['trace_export'] = config.get('trace_export')
+
+
 def parse_frontend(filename, section, config):
     tmp = {}
-    for key in ['type', 'host', 'port', 'user', 'secret', 'backend', 'packages', 'pidfile', 'templates', 'static', 'sitemap']:
+    for key in ['type', 'user', 'secret', 'backend', 'packages', 'pidfile', 'templates', 'static', 'sitemap']:
         if config.get(key) is None:
             raise openbar.exceptions.InvalidConfiguration("%s: in section 'frontend': missing key '%s'" % (filename, key))
         tmp[key] = config.get(key)
 
-    try:
-        port = config.getint('port')
-    except ValueError:
-        raise openbar.exceptions.InvalidConfiguration("%s: in section 'frontend': invalid port number '%s'" % (filename, config.get('port')))
-    tmp['port'] = port
+    parse_listen(filename, 'frontend', config, tmp)
+    parse_int(filename, 'frontend', config, tmp, 'drain_timeout', 10)
+    parse_int(filename, 'frontend', config, tmp, 'ready_timeout', 60)
+    parse_choice(filename, 'frontend', config, tmp, 'routing', ['mount', 'flat'])
+    parse_lazy(filename, 'frontend', config, tmp)
+    parse_int(filename, 'frontend', config, tmp, 'max_inflight', 0)
+    parse_int(filename, 'frontend', config, tmp, 'max_queue', 0)
+    parse_float(filename, 'frontend', config, tmp, 'queue_timeout', 1.0)
+    parse_int(filename, 'frontend', config, tmp, 'retry_after', 1)
+    parse_float(filename, 'frontend', config, tmp, 'max_timeout', 300.0)
+    if not 0 < tmp['max_timeout'] <= 86400:
+        raise openbar.exceptions.InvalidConfiguration("%s: in section '%s': max_timeout must be between 0 and 86400 seconds" % (filename, section))
+    parse_float(filename, 'frontend', config, tmp, 'slow_query', 0.5)
+    parse_float(filename, 'frontend', config, tmp, 'slow_query_sample', 1.0)
+    parse_int(filename, 'frontend', config, tmp, 'n_plus_one', 10)
+    parse_int(filename, 'frontend', config, tmp, 'task_workers', 2)
+    parse_int(filename, 'frontend', config, tmp, 'task_queue', 1000)
+    parse_int(filename, 'frontend', config, tmp, 'task_db_connections', 2)
+    parse_int(filename, 'frontend', config, tmp, 'max_requests', 0)
+    parse_int(filename, 'frontend', config, tmp, 'max_rss', 0)
+    parse_float(filename, 'frontend', config, tmp, 'memory_sample', 0.0)
+    parse_trace(filename, 'frontend', config, tmp)
+    parse_admin(filename, 'frontend', config, tmp)
+    parse_choice(filename, 'frontend', config, tmp, 'wire', ['json', 'msgpack'])
+    if tmp['wire'] == 'msgpack' and not openbar.wire.available():
+        raise openbar.exceptions.InvalidConfiguration("%s: in section '%s': wire msgpack needs the msgpack package" % (filename, section))
     _CONFIG[section] = tmp
 
 
 def parse_backend(filename, section, config):
     tmp = {}
-    for key in ['type', 'host', 'port', 'user', 'secret', 'frontend', 'packages', 'pidfile']:
+    for key in ['type', 'user', 'secret', 'frontend', 'packages', 'pidfile']:
         if config.get(key) is None:
             raise openbar.exceptions.InvalidConfiguration("%s: in section 'backend': missing key '%s'" % (filename, key))
         tmp[key] = config.get(key)
 
-    try:
-        port = config.getint('port')
-    except ValueError:
-        raise openbar.exceptions.InvalidConfiguration("%s: in section 'backend': invalid port number '%s'" % (filename, config.get('port')))
-    tmp['port'] = port
+    parse_listen(filename, 'backend', config, tmp)
+
+    parse_int(filename, 'backend', config, tmp, 'batch_workers', 4)
+    parse_int(filename, 'backend', config, tmp, 'drain_timeout', 10)
+    parse_int(filename, 'backend', config, tmp, 'ready_timeout', 60)
+    parse_choice(filename, 'backend', config, tmp, 'routing', ['mount', 'flat'])
+    parse_lazy(filename, 'backend', config, tmp)
+    parse_int(filename, 'backend', config, tmp, 'max_inflight', 0)
+    parse_int(filename, 'backend', config, tmp, 'max_queue', 0)
+    parse_float(filename, 'backend', config, tmp, 'queue_timeout', 1.0)
+    parse_int(filename, 'backend', config, tmp, 'retry_after', 1)
+    parse_float(filename, 'backend', config, tmp, 'max_timeout', 300.0)
+    if not 0 < tmp['max_timeout'] <= 86400:
+        raise openbar.exceptions.InvalidConfiguration("%s: in section '%s': max_timeout must be between 0 and 86400 seconds" % (filename, section))
+    parse_float(filename, 'backend', config, tmp, 'slow_query', 0.5)
+    parse_float(filename, 'backend', config, tmp, 'slow_query_sample', 1.0)
+    parse_int(filename, 'backend', config, tmp, 'n_plus_one', 10)
+    parse_int(filename, 'backend', config, tmp, 'task_workers', 2)
+    parse_int(filename, 'backend', config, tmp, 'task_queue', 1000)
+    parse_int(filename, 'backend', config, tmp, 'task_db_connections', 2)
+    parse_int(filename, 'backend', config, tmp, 'max_requests', 0)
+    parse_int(filename, 'backend', config, tmp, 'max_rss', 0)
+    parse_float(filename, 'backend', config, tmp, 'memory_sample', 0.0)
+    parse_trace(filename, 'backend', config, tmp)
+    parse_admin(filename, 'backend', config, tmp)
     _CONFIG[section] = tmp
 
 
@@ -96,6 +218,10 @@ def parse_database(filename, section, config):
 def get(section):
     return _CONFIG.get(section)
 
+def units():
+    return sorted(section for section in _CONFIG
+                  if _CONFIG[section]['type'] in ('frontend', 'backend'))
+
 def backend(key):
     if 'backend' not in _CONFIG:
         raise openbar.exceptions.InvalidConfiguration("%s: missing section 'backend'" % _CONFIGFILE)
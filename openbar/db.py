@@ -21,6 +21,13 @@ import openbar.log
 import openbar.run
 import openbar.db_pgsql
 
+DICT = openbar.db_pgsql.DICT
+TUPLE = openbar.db_pgsql.TUPLE
+NAMEDTUPLE = openbar.db_pgsql.NAMEDTUPLE
+COLUMNS = openbar.db_pgsql.COLUMNS
+ARRAY = openbar.db_pgsql.ARRAY
+NUMPY = openbar.db_pgsql.NUMPY
+
 class Connector(openbar.db_pgsql.Connector):
     pass
 
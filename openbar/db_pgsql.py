@@ -15,14 +15,22 @@
 #
 
 import json
+import sys
 import threading
+import time
 
 import psycopg2
+import psycopg2.extensions
 import psycopg2.extras
 import psycopg2.pool
 
+import openbar.deadline
+import openbar.dbstats
+import openbar.exceptions
 import openbar.log
 import openbar.run
+import openbar.tasks
+import openbar.trace
 
 def _fail_safe(func, *args, **kwargs):
     try:
@@ -30,14 +38,166 @@ def _fail_safe(func, *args, **kwargs):
     except:
         pass
 
+def _apply_deadline(conn):
+    """
+    bound the statements of the current transaction by the request deadline
+    """
+    remaining = openbar.deadline.remaining()
+    if remaining is None:
+        return
+    openbar.deadline.check()
+    # statement_timeout is an int of milliseconds
+    remaining = min(remaining, openbar.deadline.MAX_TIMEOUT)
+    cursor = conn.cursor()
+    try:
+        # SET LOCAL ends with the transaction, pooled connections are not affected
+        cursor.execute("SET LOCAL statement_timeout = %s", (max(1, int(remaining * 1000)), ))
+    finally:
+        cursor.close()
+
+def _deadline_missed(value):
+    if isinstance(value, openbar.exceptions.DeadlineExceeded):
+        return True
+    if isinstance(value, psycopg2.extensions.QueryCanceledError) \
+       and openbar.deadline.remaining() is not None:
+        openbar.deadline.miss()
+        return True
+    return False
+
+class _Instrumented(object):
+    """
+    cursor mixin accounting for statements in the request statistics
+    """
+    def _timed(self, func, query, *args):
+        with openbar.trace.span('db.query', 'CLIENT') as span:
+            timer0 = time.monotonic()
+            try:
+                return func(query, *args)
+            finally:
+                elapsed = time.monotonic() - timer0
+                if not isinstance(query, (str, bytes)):
+                    query = query.as_string(self)
+                openbar.dbstats.query(query, elapsed)
+                if span.recording:
+                    span.tag('db.statement', openbar.dbstats.normalize(query))
+
+    def execute(self, query, vars=None):
+        return self._timed(super(_Instrumented, self).execute, query, vars)
+
+    def executemany(self, query, vars_list):
+        return self._timed(super(_Instrumented, self).executemany, query, vars_list)
+
+    def callproc(self, procname, parameters=None):
+        return self._timed(super(_Instrumented, self).callproc, procname, parameters)
+
+class _DictCursor(_Instrumented, psycopg2.extras.RealDictCursor):
+    pass
+
+class _TupleCursor(_Instrumented, psycopg2.extensions.cursor):
+    pass
+
+class _NamedTupleCursor(_Instrumented, psycopg2.extras.NamedTupleCursor):
+    pass
+
+# array typecodes and numpy dtypes of the builtin numeric types by oid
+_ARRAY_TYPECODES = {16: 'b', 20: 'q', 21: 'h', 23: 'i', 26: 'I', 700: 'f', 701: 'd'}
+_NUMPY_DTYPES = {16: 'bool', 20: 'int64', 21: 'int16', 23: 'int32', 26: 'uint32',
+                 700: 'float32', 701: 'float64'}
+
+class _ColumnCursor(_Instrumented, psycopg2.extensions.cursor):
+    """
+    cursor fetching the result set as a dict of columns
+
+    rows are transposed chunk by chunk into lists, array.array or numpy
+    arrays for numeric columns, so that only one chunk of row tuples is
+    alive at a time. Columns holding NULL values remain lists.
+    """
+    kind = 'columns'
+    chunk = 10000
+
+    def _columns(self, rows):
+        names = [column.name for column in self.description]
+        columns = [[] for _ in names]
+        while rows:
+            for column, values in zip(columns, zip(*rows)):
+                column.extend(values)
+            rows = self._fetch()
+        return names, columns
+
+    def _fetch(self):
+        return psycopg2.extensions.cursor.fetchmany(self, self.chunk)
+
+    def _convert(self, names, columns):
+        if self.kind == 'array':
+            import array
+            for i, column in enumerate(self.description):
+                typecode = _ARRAY_TYPECODES.get(column.type_code)
+                if typecode is not None:
+                    try:
+                        columns[i] = array.array(typecode, columns[i])
+                    except TypeError:
+                        pass
+        elif self.kind == 'numpy':
+            import numpy
+            for i, column in enumerate(self.description):
+                dtype = _NUMPY_DTYPES.get(column.type_code, 'object')
+                try:
+                    columns[i] = numpy.array(columns[i], dtype=dtype)
+                except TypeError:
+                    columns[i] = numpy.array(columns[i], dtype='object')
+        return dict(zip(names, columns))
+
+    def fetchall(self):
+        if self.description is None:
+            # statements returning no rows have no columns either
+            return {}
+        return self._convert(*self._columns(self._fetch()))
+
+    def fetchmany(self, size=None):
+        if self.description is None:
+            return {}
+        rows = psycopg2.extensions.cursor.fetchmany(self, size or self.arraysize)
+        names = [column.name for column in self.description]
+        columns = [list(values) for values in zip(*rows)] or [[] for _ in names]
+        return self._convert(names, columns)
+
+class _ArrayCursor(_ColumnCursor):
+    kind = 'array'
+
+class _NumpyCursor(_ColumnCursor):
+    kind = 'numpy'
+
+DICT = 'dict'
+TUPLE = 'tuple'
+NAMEDTUPLE = 'namedtuple'
+COLUMNS = 'columns'
+ARRAY = 'array'
+NUMPY = 'numpy'
+
+_CURSORS = {
+    DICT: _DictCursor,
+    TUPLE: _TupleCursor,
+    NAMEDTUPLE: _NamedTupleCursor,
+    COLUMNS: _ColumnCursor,
+    ARRAY: _ArrayCursor,
+    NUMPY: _NumpyCursor,
+}
+
+def _cursor_factory(rows):
+    try:
+        return _CURSORS[rows]
+    except KeyError:
+        raise ValueError("unknown row format: %s" % (rows, ))
+
 class _Connection(object):
 
-    def __init__(self, conn):
+    def __init__(self, conn, rows=DICT):
         self.conn = conn
         self.cursor = None
+        self.factory = _cursor_factory(rows)
 
     def __enter__(self):
-        self.cursor = self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        self.cursor = self.conn.cursor(cursor_factory=self.factory)
         return self.cursor
 
     def __exit__(self, etype, value, traceback):
@@ -52,6 +212,16 @@ class _Connection(object):
 
 _POOLS_LOCK = threading.Lock()
 _POOLS_DICT = {}
+_TASK_POOLS = {}
+
+class _Pool(psycopg2.pool.ThreadedConnectionPool):
+    """
+    connection pool remembering its parameters, so that background tasks
+    get a pool of their own to the same database
+    """
+    def __init__(self, minconn, maxconn, **params):
+        super(_Pool, self).__init__(minconn, maxconn, **params)
+        self.params = params
 
 def get_connection_pool(host, port, username, password, dbname):
 
@@ -59,16 +229,31 @@ def get_connection_pool(host, port, username, password, dbname):
         pool = _POOLS_DICT.get((host, port, username, dbname), None)
         if pool is not None:
             return pool
-        pool = psycopg2.pool.ThreadedConnectionPool(minconn=1,
-                                                    maxconn=100,
-                                                    host=host,
-                                                    port=port,
-                                                    user=username,
-                                                    password=password,
-                                                    dbname=dbname)
+        pool = _Pool(minconn=1,
+                     maxconn=100,
+                     host=host,
+                     port=port,
+                     user=username,
+                     password=password,
+                     dbname=dbname)
         _POOLS_DICT[(host, port, username, dbname)] = pool
         return pool
 
+def _task_pool(pool):
+    """
+    pool of the background tasks for the database of pool, sized by their
+    database permits so that tasks never take connections from requests
+    """
+    params = getattr(pool, 'params', None)
+    if params is None:
+        return pool
+    with _POOLS_LOCK:
+        tasks = _TASK_POOLS.get(id(pool))
+        if tasks is None:
+            tasks = _TASK_POOLS[id(pool)] = psycopg2.pool.ThreadedConnectionPool(
+                0, openbar.tasks.DB_CONNECTIONS, **params)
+        return tasks
+
 
 class Connector(object):
 
@@ -77,6 +262,7 @@ class Connector(object):
         self.pool = pool
         self.factory = factory
         self.conn = None
+        self.conn_pool = None
 
     @staticmethod
     def _rollback_and_close_conn(conn):
@@ -90,8 +276,19 @@ class Connector(object):
             openbar.log.warn("CONNECTION CLOSE FAILED!")
 
     def __enter__(self):
-        self.conn = self.pool.getconn()
-        self.conn.set_client_encoding('UTF8')
+        openbar.deadline.check()
+        timer0 = time.monotonic()
+        self.conn_pool = self.pool
+        if openbar.tasks.in_db_task():
+            self.conn_pool = _task_pool(self.pool)
+        self.conn = self.conn_pool.getconn()
+        openbar.dbstats.wait(time.monotonic() - timer0)
+        try:
+            self.conn.set_client_encoding('UTF8')
+            _apply_deadline(self.conn)
+        except:
+            self.__exit__(*sys.exc_info())
+            raise
         return self.factory(self.conn, self.name)
 
     def __exit__(self, etype, value, traceback):
@@ -99,23 +296,49 @@ class Connector(object):
         del self.conn
         if (etype, value, traceback) == (None, None, None):
             conn.commit()
-            self.pool.putconn(conn)
+            self.conn_pool.putconn(conn)
+        elif _deadline_missed(value):
+            openbar.log.warn("CONNECTION DEADLINE EXCEEDED %r", value)
+            _fail_safe(conn.rollback)
+            self.conn_pool.putconn(conn, close=bool(conn.closed))
+            if not isinstance(value, openbar.exceptions.DeadlineExceeded):
+                raise openbar.exceptions.DeadlineExceeded(str(value)) from value
         else:
             openbar.log.warn("CONNECTION EXIT %r", (etype, value, traceback))
             self._rollback_and_close_conn(conn)
+            _fail_safe(self.conn_pool.putconn, conn, close=True)
 
 
 class Connected(object):
+    """
+    cursors of a connection, rows are dicts unless another format is
+    selected for a block:
+
+        with db(rows='tuple') as cursor:
+            ...
+
+    formats are dict, tuple, namedtuple, and columns, array or numpy
+    for which fetchall() returns a dict of columns
+    """
 
     _cursor = None
+    _rows = DICT
 
     def __init__(self, conn, name):
         self.conn = conn
         self.name = name
 
+    def __call__(self, rows=DICT):
+        _cursor_factory(rows)
+        self._rows = rows
+        return self
+
     def __enter__(self):
         assert self._cursor is None
-        self._cursor = self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        _apply_deadline(self.conn)
+        factory = _cursor_factory(self._rows)
+        self._rows = DICT
+        self._cursor = self.conn.cursor(cursor_factory=factory)
         return self._cursor
 
     def __exit__(self, etype, value, traceback):
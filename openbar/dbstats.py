@@ -0,0 +1,140 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+per-request database statistics
+"""
+
+import functools
+import random
+import re
+import threading
+
+import openbar.log
+
+SLOW_QUERY = 0.5
+SLOW_QUERY_SAMPLE = 1.0
+N_PLUS_ONE = 10
+
+_LOCAL = threading.local()
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMS = re.compile(r"%(?:\([^)]*\))?s")
+_LISTS = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.I)
+_SPACES = re.compile(r"\s+")
+
+def configure(slow_query, slow_query_sample, n_plus_one):
+    """
+    set the slow query threshold in seconds, 0 disables the slow query log,
+    the fraction of slow queries logged and the count of identical
+    statements flagging a request as N+1, 0 disables the check
+    """
+    global SLOW_QUERY, SLOW_QUERY_SAMPLE, N_PLUS_ONE
+    SLOW_QUERY = slow_query
+    SLOW_QUERY_SAMPLE = slow_query_sample
+    N_PLUS_ONE = n_plus_one
+
+@functools.lru_cache(maxsize=1024)
+def normalize(sql):
+    """
+    strip the literals and parameters of a statement so that statements
+    differing only by their values compare equal
+    """
+    if isinstance(sql, bytes):
+        sql = sql.decode('utf-8', 'replace')
+    sql = _COMMENTS.sub(' ', sql)
+    sql = _STRINGS.sub('?', sql)
+    sql = _PARAMS.sub('?', sql)
+    sql = _NUMBERS.sub('?', sql)
+    sql = _LISTS.sub('IN (...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+class _Stats(object):
+    """
+    database figures of a request, shared with its batch sub-requests
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queries = 0
+        self.time = 0.0
+        self.wait = 0.0
+        self.statements = {}
+
+    def fields(self):
+        fields = {
+            'db_queries': self.queries,
+            'db_time': '%.3f' % self.time,
+            'db_wait': '%.3f' % self.wait,
+        }
+        if N_PLUS_ONE and self.statements:
+            statement, count = max(self.statements.items(), key=lambda item: item[1])
+            if count > N_PLUS_ONE:
+                fields['n_plus_one'] = count
+                openbar.log.warn("N+1 SUSPECTED %i x %s", count, statement)
+        return fields
+
+def query(sql, elapsed):
+    """
+    account for a statement executed by the current request
+    """
+    stats = getattr(_LOCAL, 'stats', None)
+    slow = SLOW_QUERY and elapsed >= SLOW_QUERY
+    if stats is None and not slow:
+        return
+    statement = normalize(sql)
+    if stats is not None:
+        with stats.lock:
+            stats.queries += 1
+            stats.time += elapsed
+            stats.statements[statement] = stats.statements.get(statement, 0) + 1
+    if slow and random.random() < SLOW_QUERY_SAMPLE:
+        openbar.log.warn("SLOW QUERY %.3f %s", elapsed, statement)
+
+def wait(elapsed):
+    """
+    account for the time the current request waited for a pooled connection
+    """
+    stats = getattr(_LOCAL, 'stats', None)
+    if stats is not None:
+        with stats.lock:
+            stats.wait += elapsed
+
+
+class StatsMiddleware(object):
+    """
+    collect the database statistics of each request into its log line
+    """
+    def __init__(self, app):
+        self.app = app
+
+    def __call__(self, environ, start_response):
+        # batch sub-requests inherit the statistics of the batch from the
+        # environ, only the request that created them reports them
+        stats = environ.get('openbar.dbstats')
+        owner = stats is None
+        if owner:
+            stats = environ['openbar.dbstats'] = _Stats()
+
+        previous = getattr(_LOCAL, 'stats', None)
+        _LOCAL.stats = stats
+        try:
+            return self.app(environ, start_response)
+        finally:
+            _LOCAL.stats = previous
+            if owner and stats.queries:
+                environ.setdefault('openbar.log', {}).update(stats.fields())
@@ -0,0 +1,149 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+
+"""
+per-request deadlines
+"""
+
+import json as pyjson
+import math
+import threading
+import time
+
+import openbar.exceptions
+import openbar.routes
+
+HEADER = 'X-Openbar-Timeout'
+MAX_TIMEOUT = 300.0
+
+_TIMEOUT = pyjson.dumps({'error': 'Gateway Timeout'}).encode('utf-8')
+
+_LOCAL = threading.local()
+
+def configure(max_timeout):
+    """
+    set the longest deadline a caller may request, in seconds
+    """
+    global MAX_TIMEOUT
+    MAX_TIMEOUT = max_timeout
+
+def parse(value):
+    """
+    timeout requested in a header, bounded by MAX_TIMEOUT, None if it is
+    not a positive number of seconds
+    """
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(seconds) or seconds <= 0:
+        return None
+    return min(seconds, MAX_TIMEOUT)
+
+def start(seconds):
+    _LOCAL.deadline = None if seconds is None else time.monotonic() + seconds
+    _LOCAL.missed = False
+
+def clear():
+    _LOCAL.deadline = None
+    _LOCAL.missed = False
+
+def remaining():
+    """
+    seconds left before the current deadline, None if there is none
+    """
+    deadline = getattr(_LOCAL, 'deadline', None)
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+def miss():
+    _LOCAL.missed = True
+
+def missed():
+    return getattr(_LOCAL, 'missed', False)
+
+def check():
+    """
+    raise DeadlineExceeded if the current deadline has passed
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        miss()
+        raise openbar.exceptions.DeadlineExceeded("deadline exceeded by %.3fs" % -left)
+
+
+class DeadlineMiddleware(object):
+    """
+    start the deadline of each request
+
+    the deadline is the lowest of the timeout requested by the caller in
+    the X-Openbar-Timeout header, at most MAX_TIMEOUT, and of the timeout
+    registered for the mount. Invalid headers are ignored.
+    Requests failing after missing their deadline are answered with a 504.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    @staticmethod
+    def _timeout(environ):
+        timeouts = []
+        requested = parse(environ.get('HTTP_X_OPENBAR_TIMEOUT'))
+        if requested is not None:
+            timeouts.append(requested)
+        parts = environ.get('PATH_INFO', '').split('/', 3)
+        if len(parts) > 3:
+            options = openbar.routes.options(parts[1], parts[2]) or {}
+            if options.get('timeout') is not None:
+                timeouts.append(options['timeout'])
+        return min(timeouts) if timeouts else None
+
+    @staticmethod
+    def _timed_out(environ, start_response):
+        environ.setdefault('openbar.log', {})['deadline'] = 'missed'
+        return start_response('504 Gateway Timeout', [
+            ('Content-Type', 'application/json'),
+            ('Content-Length', str(len(_TIMEOUT))),
+        ])
+
+    def __call__(self, environ, start_response):
+        timeout = self._timeout(environ)
+        if timeout is None:
+            return self.app(environ, start_response)
+        if timeout <= 0:
+            self._timed_out(environ, start_response)
+            return [_TIMEOUT]
+
+        replaced = []
+        def _start_response(status, headers, exc_info=None):
+            if missed() and status.startswith('500'):
+                replaced.append(True)
+                return self._timed_out(environ, start_response)
+            return start_response(status, headers, exc_info)
+
+        start(timeout)
+        try:
+            body = self.app(environ, _start_response)
+            if missed():
+                environ.setdefault('openbar.log', {})['deadline'] = 'missed'
+        finally:
+            clear()
+
+        if replaced:
+            if hasattr(body, 'close'):
+                body.close()
+            return [_TIMEOUT]
+        return body
@@ -16,3 +16,12 @@
 
 class InvalidConfiguration(Exception):
     pass
+
+class BackendError(Exception):
+    def __init__(self, status, data=None):
+        super(BackendError, self).__init__(status, data)
+        self.status = status
+        self.data = data
+
+class DeadlineExceeded(Exception):
+    pass
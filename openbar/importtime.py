@@ -0,0 +1,97 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+
+"""
+per-module import time accounting for startup profiling
+"""
+
+import sys
+import time
+
+import openbar.log
+
+class _TimedLoader(object):
+    """
+    loader proxy timing the execution of a module
+    """
+    def __init__(self, profiler, loader):
+        self.profiler = profiler
+        self.loader = loader
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        profiler = self.profiler
+        name = module.__name__
+        profiler.stack.append(0.0)
+        timer0 = time.perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - timer0
+            children = profiler.stack.pop()
+            if profiler.stack:
+                profiler.stack[-1] += elapsed
+            profiler.times[name] = (elapsed, elapsed - children)
+            # do not leave the proxy behind once the module is loaded
+            module.__loader__ = self.loader
+            if getattr(module, '__spec__', None) is not None:
+                module.__spec__.loader = self.loader
+
+
+class ImportProfiler(object):
+    """
+    meta path finder wrapping the loaders found by the other finders
+    """
+    def __init__(self):
+        self.times = {}
+        self.stack = []
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                spec.loader = _TimedLoader(self, spec.loader)
+            return spec
+        return None
+
+def install():
+    profiler = ImportProfiler()
+    sys.meta_path.insert(0, profiler)
+    return profiler
+
+def uninstall(profiler):
+    if profiler in sys.meta_path:
+        sys.meta_path.remove(profiler)
+
+def report(profiler, count=30):
+    """
+    log the modules that took the most time to import, inclusive of the
+    modules they import themselves
+    """
+    total = sum(self_ for (_, self_) in profiler.times.values())
+    openbar.log.info("Startup: %i modules imported in %.3fs", len(profiler.times), total)
+    ranked = sorted(profiler.times.items(), key=lambda item: item[1][0], reverse=True)
+    for name, (inclusive, self_) in ranked[:count]:
+        openbar.log.info("Startup: %8.1fms %8.1fms self  %s", inclusive * 1000, self_ * 1000, name)
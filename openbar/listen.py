@@ -0,0 +1,112 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+
+"""
+listening sockets for openbar units
+"""
+
+import os
+import socket
+import stat
+
+LISTEN_FDS_START = 3
+
+def _bind_inet(host, port):
+    info = socket.getaddrinfo(host, port, socket.AF_UNSPEC, socket.SOCK_STREAM,
+                              0, socket.AI_PASSIVE)
+    family, type_, proto, _, address = info[0]
+    sock = socket.socket(family, type_, proto)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(address)
+    return sock
+
+def _bind_unix(path, uid=None, gid=None, mode=None):
+    try:
+        if stat.S_ISSOCK(os.lstat(path).st_mode):
+            os.unlink(path)
+        else:
+            raise OSError("refusing to replace non-socket file: %s" % path)
+    except FileNotFoundError:
+        pass
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # never expose the socket before ownership and mode are set
+    umask = os.umask(0o177)
+    try:
+        sock.bind(path)
+    finally:
+        os.umask(umask)
+    if uid is not None or gid is not None:
+        os.chown(path, -1 if uid is None else uid, -1 if gid is None else gid)
+    os.chmod(path, 0o660 if mode is None else mode)
+    return sock
+
+def _inherit(fd):
+    sock = socket.socket(fileno=fd)
+    if sock.type != socket.SOCK_STREAM:
+        raise OSError("inherited descriptor %i is not a stream socket" % fd)
+    return sock
+
+def _activated():
+    """
+    socket passed by a supervisor using the LISTEN_PID/LISTEN_FDS protocol
+    """
+    try:
+        pid = int(os.environ.get('LISTEN_PID', ''))
+        count = int(os.environ.get('LISTEN_FDS', ''))
+    except ValueError:
+        raise OSError("no socket passed by supervisor")
+    if pid != os.getpid() or count < 1:
+        raise OSError("no socket passed by supervisor")
+    for key in ('LISTEN_PID', 'LISTEN_FDS', 'LISTEN_FDNAMES'):
+        os.environ.pop(key, None)
+    return _inherit(LISTEN_FDS_START)
+
+def parse(listen):
+    """
+    validate a listen address: unix:/path, fd:N or systemd
+    """
+    if listen.startswith('unix:') and len(listen) > 5:
+        return ('unix', listen[5:])
+    if listen.startswith('fd:') and listen[3:].isdigit():
+        return ('fd', int(listen[3:]))
+    if listen == 'systemd':
+        return ('systemd', None)
+    raise ValueError("invalid listen address: %s" % listen)
+
+def listener(listen=None, host=None, port=None, uid=None, gid=None, mode=None):
+    """
+    return a listening socket, either bound to host:port or to the listen address
+    """
+    if listen is None:
+        sock = _bind_inet(host, port)
+    else:
+        kind, value = parse(listen)
+        if kind == 'unix':
+            sock = _bind_unix(value, uid, gid, mode)
+        elif kind == 'fd':
+            sock = _inherit(value)
+        else:
+            sock = _activated()
+    sock.set_inheritable(True)
+    sock.listen(socket.SOMAXCONN)
+    return sock
+
+def describe(sock):
+    address = sock.getsockname()
+    if isinstance(address, tuple):
+        return "%s:%i" % address[:2]
+    return "unix:%s" % address
@@ -0,0 +1,119 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+memory allocated by the routes of the unit
+
+a sample of the requests is run under tracemalloc, one at a time, and the
+memory each of them allocates is accounted to its route. The routes that
+allocate the most are reported by install_stats(). Tracing is only enabled
+for the duration of a sampled request, but it slows down every allocation
+of the process meanwhile, and the requests running alongside a sampled one
+allocate on the same heap, so figures are only approximate on a busy unit.
+"""
+
+import random
+import threading
+import tracemalloc
+
+SAMPLE = 0.0
+TOP = 20
+
+_SAMPLING = threading.Lock()
+_LOCK = threading.Lock()
+_ROUTES = {}
+
+def configure(sample):
+    """
+    set the fraction of requests measured, 0 disables sampling
+    """
+    global SAMPLE
+    SAMPLE = sample
+
+def enabled():
+    return SAMPLE > 0
+
+def _record(route, allocated, retained):
+    with _LOCK:
+        stats = _ROUTES.get(route)
+        if stats is None:
+            stats = _ROUTES[route] = {'samples': 0, 'allocated': 0,
+                                      'retained': 0, 'peak': 0}
+        stats['samples'] += 1
+        stats['allocated'] += allocated
+        stats['retained'] += retained
+        stats['peak'] = max(stats['peak'], allocated)
+
+def stats():
+    """
+    routes allocating the most, with their average allocation per request
+    """
+    with _LOCK:
+        routes = sorted(_ROUTES.items(), key=lambda item: item[1]['allocated'],
+                        reverse=True)[:TOP]
+        top = [{'route': route,
+                'samples': stats['samples'],
+                'allocated': stats['allocated'],
+                'allocated_avg': stats['allocated'] // stats['samples'],
+                'retained_avg': stats['retained'] // stats['samples'],
+                'peak': stats['peak']} for route, stats in routes]
+    return {'sample': SAMPLE, 'routes': top}
+
+
+class MemoryMiddleware(object):
+    """
+    measure the allocations of a sample of the requests to root
+    """
+    def __init__(self, app, root):
+        self.app = app
+        self.root = root
+
+    def _route(self, environ, path):
+        route = environ.get('bottle.route')
+        if route is None:
+            return None
+        rule = route.rule
+        prefix = '/' + '/'.join(path.strip('/').split('/')[:2])
+        if route.app is not self.root and not rule.startswith(prefix + '/'):
+            # routes of a mount are relative to its /version/name/ prefix
+            rule = prefix + rule
+        return '%s %s' % (route.method, rule)
+
+    def __call__(self, environ, start_response):
+        if random.random() >= SAMPLE or not _SAMPLING.acquire(False):
+            return self.app(environ, start_response)
+        # leave tracing alone if it was started by someone else,
+        # PYTHONTRACEMALLOC for instance
+        started = not tracemalloc.is_tracing()
+        try:
+            path = environ.get('PATH_INFO', '')
+            if started:
+                tracemalloc.start()
+            elif hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            ret = self.app(environ, start_response)
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            if started:
+                tracemalloc.stop()
+            _SAMPLING.release()
+        route = self._route(environ, path)
+        if route is not None:
+            _record(route, peak - baseline, current - baseline)
+        return ret
+
+def install_stats(root, path='/memory'):
+    root.route(path, method='GET', callback=stats)
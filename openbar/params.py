@@ -19,10 +19,11 @@ plumbing for setting up backend
 """
 
 import http.client
-import json as pyjson
 
 import bottle
 
+import openbar.wire
+
 _MANDATORY = object()
 _UNSET = object()
 
@@ -76,6 +77,9 @@ class Parameters(object):
     def any(self, name, default=_MANDATORY, validate=None):
         return self.get(name, default, validate)
 
+    def any_list(self, name, default=_MANDATORY, validate=None, maxlen=None):
+        return self.get_list(name, default, validate, maxlen)
+
     def string(self, name, default=_MANDATORY, choice=None):
         def _(val):
             if not isinstance(val, str):
@@ -119,16 +123,61 @@ class Parameters(object):
                 raise ValueError('too large')
         return float(self.get(name, default, _))
 
+def _body():
+    """
+    decoded request body, in the format given by its Content-Type
+    """
+    if openbar.wire.is_msgpack(bottle.request.content_type):
+        payload = bottle.request.body.read()
+        if not payload:
+            return None
+        try:
+            return openbar.wire.loads(payload, openbar.wire.MSGPACK)
+        except ValueError:
+            error(400, 'invalid msgpack body')
+    return bottle.request.json
+
 def json():
-    return Parameters(bottle.request.json or {})
+    return Parameters(_body() or {})
 
 def no_json():
-    if bottle.request.json:
+    if _body():
         error(400, 'no json expected')
 
+def _format():
+    return openbar.wire.negotiate(bottle.request.get_header('Accept'))
+
 def error(code, data=None):
     if data is None:
         data = {'error': http.client.responses.get(code, "Error code %i" % code)}
-    response = bottle.HTTPResponse(pyjson.dumps(data), code)
-    response.set_header('Content-Type', 'application/json')
+    content_type = _format()
+    response = bottle.HTTPResponse(openbar.wire.dumps(data, content_type), code)
+    response.set_header('Content-Type', content_type)
     raise response
+
+
+class WirePlugin(object):
+    """
+    encode the dicts returned by handlers in the format asked by the caller
+
+    it is installed after bottle's JSON plugin and runs before it, so that
+    dicts are encoded once, as MessagePack when the Accept header prefers
+    it and as JSON otherwise.
+    """
+    name = 'wire'
+    api = 2
+
+    def apply(self, callback, route):
+        def wrapper(*args, **kwargs):
+            rv = callback(*args, **kwargs)
+            if isinstance(rv, dict):
+                content_type = _format()
+                body = openbar.wire.dumps(rv, content_type)
+                bottle.response.content_type = content_type
+                return body
+            if isinstance(rv, bottle.HTTPResponse) and isinstance(rv.body, dict):
+                content_type = _format()
+                rv.body = openbar.wire.dumps(rv.body, content_type)
+                rv.content_type = content_type
+            return rv
+        return wrapper
@@ -18,33 +18,141 @@
 plumbing for setting up routes
 """
 
+import importlib
+import threading
+
 import bottle
 
 import openbar.log
+import openbar.params
 
 
 ##
 ## Routes registration
 ##
 _ROUTES = {}
+_LAZY = {}
+
+def _app():
+    app = bottle.Bottle()
+    app.install(openbar.params.WirePlugin())
+    return app
 
 def _setup_route(app, version, name):
+    if (version, name) not in _ROUTES and (version, name) in _LAZY:
+        importlib.import_module(_LAZY[(version, name)])
     data = _ROUTES[(version, name)]
     for parent in data['override']:
         _setup_route(app, parent, name)
     data['setup'](app)
 
-def install_routes(root):
+class _PrefixDispatcher(object):
+    """
+    application dispatching versioned requests to their mount by prefix
+
+    the /<version>/<name>/ prefix of a request is looked up in a dict and
+    the request handed to its application directly, as bottle's mount
+    would, so the cost does not grow with the number of mounts. Other
+    requests go through the root application.
+    """
+    def __init__(self, root, apps):
+        self.root = root
+        self.apps = apps
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO') or '/'
+        parts = path.split('/', 3)
+        app = self.apps.get(tuple(parts[1:3])) if len(parts) > 3 else None
+        if app is None:
+            return self.root(environ, start_response)
+        script_name = environ.get('SCRIPT_NAME', '')
+        environ['SCRIPT_NAME'] = '%s/%s/%s' % (script_name.rstrip('/'), parts[1], parts[2])
+        environ['PATH_INFO'] = '/' + parts[3]
+        try:
+            return app(environ, start_response)
+        finally:
+            environ['SCRIPT_NAME'] = script_name
+            environ['PATH_INFO'] = path
+
+class _LazyApp(object):
+    """
+    application importing the module registering its routes on first request
+    """
+    def __init__(self, version, name):
+        self.version = version
+        self.name = name
+        self.app = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        with self.lock:
+            if self.app is None:
+                openbar.log.info('Loading %s for %s/%s', _LAZY[(self.version, self.name)],
+                                 self.version, self.name)
+                app = _app()
+                _setup_route(app, self.version, self.name)
+                self.app = app
+        return self.app
+
+    def __call__(self, environ, start_response):
+        app = self.app or self.load()
+        return app(environ, start_response)
+
+def install_routes(root, flat=False):
+    """
+    install registered routes on the root application and return the
+    application serving them
+
+    each (version, name) is a separate application mounted on the root.
+    In flat mode requests are dispatched to the mounts by their prefix
+    before reaching the root, hooks of the root application are then not
+    run for versioned routes.
+
+    lazily registered mounts only import their module when first requested.
+    """
+    root.install(openbar.params.WirePlugin())
+    apps = {}
     for (version, name) in sorted(_ROUTES):
         mount_point = '/%s/%s/' % (version, name)
         openbar.log.info('Installing %s at %s', version, mount_point)
-        app = bottle.Bottle()
+        app = apps[(version, name)] = _app()
         _setup_route(app, version, name)
         root.mount(mount_point, app)
+    # mounts whose module was already imported are installed as usual
+    for (version, name) in sorted(set(_LAZY) - set(_ROUTES)):
+        mount_point = '/%s/%s/' % (version, name)
+        openbar.log.info('Installing %s at %s (lazy)', version, mount_point)
+        app = apps[(version, name)] = _LazyApp(version, name)
+        root.mount(mount_point, app)
+    if flat:
+        return _PrefixDispatcher(root, apps)
+    return root
 
-def register(version, name, override=()):
+def register(version, name, override=(), priority=None, concurrency=None, queue=None,
+             timeout=None):
+    """
+    register the setup function of a mount
+
+    priority, concurrency and queue tune admission control for the mount,
+    see openbar.admission. timeout is the default deadline in seconds of its
+    requests, see openbar.deadline.
+    """
     if isinstance(override, str):
         override = (override, )
     def _(setup):
-        _ROUTES[(version, name)] = {'setup': setup, 'override' : override}
+        _ROUTES[(version, name)] = {'setup': setup, 'override' : override,
+                                    'priority': priority,
+                                    'concurrency': concurrency,
+                                    'queue': queue,
+                                    'timeout': timeout}
     return _
+
+def options(version, name):
+    return _ROUTES.get((version, name))
+
+def register_lazy(version, name, module):
+    """
+    declare that module registers the routes for version and name, so that it
+    is only imported on the first request to that mount
+    """
+    _LAZY[(version, name)] = module
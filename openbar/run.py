@@ -20,23 +20,34 @@ interface to create a daemonized running process
 
 import atexit
 import errno
+import fcntl
+import glob
 import grp
+import itertools
 import os
 import pwd
+import resource
+import select
 import signal
 import sys
 import time
 import importlib
 
-import bottle
-from bottle.ext import beaker
-
+import openbar.exceptions
+import openbar.listen
 import openbar.log
-import openbar.routes
+import openbar.sampler
 import openbar.templates
+import openbar.trace
 
 VERBOSE = 0
 DAEMONIZE = 1
+PROFILE_STARTUP = False
+PROFILE_SECONDS = 10
+PROFILE_MAX_SECONDS = 3600
+# seconds past drain_timeout before the master kills a worker, and again
+# before the controller gives up on the master
+KILL_GRACE = 5
 
 try:
     from setproctitle import setproctitle
@@ -64,7 +75,11 @@ class _Daemon(object):
                  procname,
                  username=None,
                  syslog=True,
-                 pidfile=None):
+                 pidfile=None,
+                 drain_timeout=10,
+                 ready_timeout=60,
+                 max_requests=0,
+                 max_rss=0):
         self.procname = procname
         self.syslog = syslog
         self.pidfile = pidfile
@@ -72,6 +87,20 @@ class _Daemon(object):
         self.pwd = None
         self.run = None
         self.terminate = None
+        self.listen = None
+        self.listener = None
+        self.drain_timeout = drain_timeout
+        self.ready_timeout = ready_timeout
+        self.workers = {}
+        self.ready_fd = None
+        self.wakeup = None
+        self.pidfd = None
+        self.max_requests = max_requests
+        self.max_rss = max_rss
+        self.recycle = None
+        self.requests = itertools.count(1)
+        self.rss_checked = 0
+        self.retiring = False
 
     def _open_log(self, debug=None):
         openbar.log.setup(self.procname, debugging=debug)
@@ -87,11 +116,23 @@ class _Daemon(object):
                 message = "Warning: overwriting stale pidfile %s with pid %i\n"
                 sys.stderr.write(message % (self.pidfile, pid))
 
+        _mkdir_p(os.path.dirname(self.pidfile))
+        # the lock is held for the lifetime of the process and tells
+        # controllers whether the pidfile is stale without probing processes
+        fd = os.open(self.pidfile, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            message = "Error: process \"%s\" is already running\n"
+            sys.stderr.write(message % (self.procname, ))
+            sys.exit(1)
+        os.ftruncate(fd, 0)
+        os.write(fd, b"%i\n" % os.getpid())
+        self.pidfd = fd
+
         def _del_pid():
             os.remove(self.pidfile)
         atexit.register(_del_pid)
-        _mkdir_p(os.path.dirname(self.pidfile))
-        open(self.pidfile, 'w').write("%i\n" % os.getpid())
 
     def _drop_priv(self):
         if os.getuid() != 0:
@@ -130,13 +171,43 @@ class _Daemon(object):
             sys.stderr.write("Cannot fork: %d (%s)\n" % (exc.errno, exc.strerror))
             sys.exit(1)
 
-        def _handler(signum, frame):
-            if self.terminate:
-                self.terminate()
-            else:
-                openbar.log.info("Got signal %i. Exiting", signum)
-                sys.exit(0)
-        signal.signal(signal.SIGTERM, _handler)
+        signal.signal(signal.SIGTERM, self._handler)
+
+    def _handler(self, signum, frame):
+        if self.terminate:
+            self.terminate()
+        else:
+            openbar.log.info("Got signal %i. Exiting", signum)
+            sys.exit(0)
+
+    #
+    # on-demand profiling: SIGUSR1 samples the stacks of the serving process
+    # for a while, nothing runs until then.
+    #
+    def _profile_prefix(self):
+        if self.pidfile:
+            return os.path.splitext(self.pidfile)[0]
+        return os.path.join('/tmp', self.procname)
+
+    def _profile_request(self):
+        return self._profile_prefix() + '.profile'
+
+    def _profile(self, signum, frame):
+        seconds = PROFILE_SECONDS
+        try:
+            with open(self._profile_request()) as request:
+                seconds = float(request.read())
+        except (OSError, ValueError):
+            pass
+        if not 0 < seconds <= PROFILE_MAX_SECONDS:
+            seconds = PROFILE_SECONDS
+        path = "%s.%i.%s.folded" % (self._profile_prefix(), os.getpid(),
+                                    time.strftime("%Y%m%d%H%M%S"))
+        try:
+            if not openbar.sampler.start(seconds, path):
+                openbar.log.warn("Profiling already in progress")
+        except:
+            openbar.log.exception("Profiling failed")
 
     def _start(self, foreground=True):
         if self.username is None:
@@ -152,6 +223,11 @@ class _Daemon(object):
 
         setproctitle(self.procname)
 
+        # listening sockets are bound with full privileges so that unix
+        # sockets can be handed over to the unprivileged user
+        if self.listen:
+            self.listener = self.listen(self.pwd)
+
         if not foreground:
             self._drop_priv()
             self._pre_daemonize()
@@ -164,7 +240,216 @@ class _Daemon(object):
             self._pre_daemonize()
             self._open_log(debug=True)
 
-        self.run()
+        if self.listener is None:
+            signal.signal(signal.SIGUSR1, self._profile)
+            self.run()
+        else:
+            self._supervise()
+
+    #
+    # master/worker supervision: the master holds the listening socket and
+    # forks workers serving on it, so that workers may be replaced without
+    # ever closing the socket.
+    #
+    def _worker(self):
+        rfd, wfd = os.pipe()
+        pid = os.fork()
+        if pid:
+            os.close(wfd)
+            return pid, rfd
+
+        os.close(rfd)
+        signal.set_wakeup_fd(-1)
+        for fd in self.wakeup:
+            os.close(fd)
+        os.close(self.recycle[0])
+        self.recycle = (None, self.recycle[1])
+        # only the master holds the pidfile lock
+        if self.pidfd is not None:
+            os.close(self.pidfd)
+            self.pidfd = None
+        signal.signal(signal.SIGHUP, signal.SIG_DFL)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, self._handler)
+        signal.signal(signal.SIGUSR1, self._profile)
+        setproctitle("%s: worker" % self.procname)
+
+        self.ready_fd = wfd
+        status = 0
+        try:
+            self.run()
+        except SystemExit as exc:
+            if exc.code is not None:
+                status = exc.code if isinstance(exc.code, int) else 1
+        except:
+            openbar.log.exception("Worker failed")
+            status = 1
+        os._exit(status)
+
+    def ready(self):
+        """
+        notify the master that this worker is ready to serve
+        """
+        if self.ready_fd is not None:
+            os.write(self.ready_fd, b'.')
+            os.close(self.ready_fd)
+            self.ready_fd = None
+
+    @staticmethod
+    def _rss():
+        try:
+            with open('/proc/self/statm') as statm:
+                return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, IndexError):
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def served(self):
+        """
+        account for a request served by this worker, asking the master for
+        a replacement once it is over its request count or memory budget
+        """
+        if self.retiring or self.recycle is None or self.recycle[0] is not None:
+            return
+        requests = next(self.requests)
+        reason = None
+        if self.max_requests and requests >= self.max_requests:
+            reason = "%i requests" % requests
+        elif self.max_rss and time.monotonic() - self.rss_checked >= 1:
+            self.rss_checked = time.monotonic()
+            rss = self._rss()
+            if rss >= self.max_rss * 1024 * 1024:
+                reason = "%i MB resident" % (rss // (1024 * 1024))
+        if reason is None:
+            return
+        self.retiring = True
+        openbar.log.info("Worker %i is due for recycling after %s", os.getpid(), reason)
+        os.write(self.recycle[1], b"%i\n" % os.getpid())
+
+    def _spawn(self):
+        pid, rfd = self._worker()
+        try:
+            readable = select.select([rfd], [], [], self.ready_timeout)[0]
+            ready = readable and os.read(rfd, 1) == b'.'
+        finally:
+            os.close(rfd)
+        if not ready:
+            self._stop_workers([pid], 0)
+            return None
+        self.workers[pid] = time.time()
+        return pid
+
+    def _stop_workers(self, pids, timeout):
+        remaining = set(pids)
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        deadline = time.time() + timeout
+        while remaining:
+            for pid in list(remaining):
+                try:
+                    done = os.waitpid(pid, os.WNOHANG)[0]
+                except ChildProcessError:
+                    done = pid
+                if done:
+                    remaining.discard(pid)
+                    self.workers.pop(pid, None)
+            if not remaining:
+                break
+            if time.time() >= deadline:
+                for pid in remaining:
+                    openbar.log.warn("Worker %i did not drain in time, killing", pid)
+                    try:
+                        os.kill(pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+                deadline = float('inf')
+            time.sleep(.1)
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if self.workers.pop(pid, None) is not None:
+                openbar.log.warn("Worker %i exited unexpectedly with status %i", pid, status)
+
+    def _replace(self, previous, action):
+        pid = self._spawn()
+        if pid is None:
+            openbar.log.error("%s failed, new worker did not become ready", action)
+            return
+        openbar.log.info("Worker %i ready, draining previous workers", pid)
+        self._stop_workers(previous, self.drain_timeout + KILL_GRACE)
+
+    def _reload(self):
+        openbar.log.info("Reloading")
+        self._replace(list(self.workers), "Reload")
+
+    def _recycle(self):
+        # workers over their budget write their pid, they are replaced
+        # one at a time like on reload
+        try:
+            data = os.read(self.recycle[0], 512)
+        except BlockingIOError:
+            return
+        for pid in set(int(_) for _ in data.split()):
+            if pid in self.workers:
+                openbar.log.info("Recycling worker %i", pid)
+                self._replace([pid], "Recycling")
+
+    def _supervise(self):
+        self.wakeup = os.pipe()
+        for fd in self.wakeup:
+            os.set_blocking(fd, False)
+        self.recycle = os.pipe()
+        os.set_blocking(self.recycle[0], False)
+        signal.set_wakeup_fd(self.wakeup[1])
+
+        pending = []
+        def _handler(signum, frame):
+            pending.append(signum)
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD,
+                       signal.SIGUSR1):
+            signal.signal(signum, _handler)
+
+        if self._spawn() is None:
+            openbar.log.error("Worker did not become ready")
+            sys.exit(1)
+
+        while True:
+            readable = select.select([self.wakeup[0], self.recycle[0]], [], [], 1.0)[0]
+            try:
+                os.read(self.wakeup[0], 512)
+            except BlockingIOError:
+                pass
+            signals, pending[:] = set(pending), []
+
+            if signal.SIGTERM in signals or signal.SIGINT in signals:
+                self._stop_workers(list(self.workers), self.drain_timeout + KILL_GRACE)
+                break
+            if signal.SIGHUP in signals:
+                self._reload()
+            if signal.SIGUSR1 in signals:
+                for pid in self.workers:
+                    os.kill(pid, signal.SIGUSR1)
+            if self.recycle[0] in readable:
+                self._recycle()
+
+            self._reap()
+            if not self.workers:
+                # avoid spinning on a worker that dies right after startup
+                time.sleep(1)
+                self._spawn()
+
+        openbar.log.info("Stopped")
+        sys.exit(0)
 
 
     setup = None
@@ -180,34 +465,63 @@ class _Daemon(object):
                 return
             raise
 
+    def _is_locked(self):
+        """
+        check the pidfile lock, None if it cannot be checked
+        """
+        try:
+            fd = os.open(self.pidfile, os.O_RDONLY)
+        except OSError:
+            return None
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        except OSError:
+            return None
+        finally:
+            os.close(fd)
+        return False
+
+    @staticmethod
+    def _is_alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def _is_procname(self, pid):
+        """
+        guard against pid reuse when /proc is available
+        """
+        procname = self.procname.split('openbar-')[-1]
+        try:
+            with open("/proc/%i/cmdline" % pid, 'rb') as cmdline:
+                argv = cmdline.read().replace(b'\0', b' ').decode('utf-8', 'replace')
+        except FileNotFoundError:
+            return not os.path.isdir("/proc/self")
+        except OSError:
+            return True
+        return procname in [arg.rstrip(':') for arg in argv.split()]
+
     def _is_running(self, pid=None):
         if pid is None:
             pid = self._get_pid()
         if pid is None:
             return False
-        procname = self.procname.split('openbar-')[-1]
-
-        for line in os.popen("ps aux").read().split("\n"):
-            parts = line.split()
-            if not parts:
-                continue
-            if parts[0] != self.username:
-                continue
-            try:
-                ppid = int(parts[1])
-            except:
-                continue
-            if ppid != pid:
-                continue
-            if procname in parts:
-                return True
-        return False
+        if self._is_locked():
+            return True
+        # daemons started before the pidfile was locked do not hold it
+        return self._is_alive(pid) and self._is_procname(pid)
 
     def status(self):
         """
         check if daemonized process is running
         """
-        return self._is_running() is not None
+        return self._is_running()
 
     def _kill(self, sig, wait=None):
         pid = self._get_pid()
@@ -224,11 +538,15 @@ class _Daemon(object):
         os.kill(pid, sig)
         timer0 = time.time()
         if wait:
-            while self._is_running(pid):
-                if time.time() - timer0 >= 10:
+            # the pidfile was checked above, only the process is polled now,
+            # for longer than the master may take to kill its workers
+            while self._is_alive(pid):
+                if time.time() - timer0 >= self.drain_timeout + 2 * KILL_GRACE:
                     message = "Warning: process \"%s\" is still running\n"
+                    sys.stderr.write(message % (self.procname, ))
                     sys.exit(1)
-                time.sleep(.1)
+                time.sleep(.05)
+        return True
 
     def stop(self):
         """
@@ -242,7 +560,64 @@ class _Daemon(object):
         """
         self._kill(signal.SIGKILL)
 
-    def start(self, start, stop=None, setup=None, foreground=None):
+    def reload(self):
+        """
+        replace workers of daemonized process without closing its socket
+        """
+        self._kill(signal.SIGHUP)
+
+    def _write_profile_request(self, request, seconds):
+        # the directory may be writable by others, the request is created
+        # with the privileges of the unit and never through an existing
+        # file or link
+        pw = None
+        if os.geteuid() == 0 and self.username is not None:
+            pw = pwd.getpwnam(self.username)
+            groups = os.getgroups()
+            os.setgroups([pw.pw_gid])
+            os.setegid(pw.pw_gid)
+            os.seteuid(pw.pw_uid)
+        try:
+            try:
+                # left over by an interrupted run
+                os.unlink(request)
+            except FileNotFoundError:
+                pass
+            fd = os.open(request, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o644)
+            with os.fdopen(fd, 'w') as output:
+                os.fchmod(fd, 0o644)
+                output.write("%s\n" % seconds)
+        except OSError as exc:
+            sys.stderr.write("Cannot write %s: %s\n" % (request, exc))
+            return False
+        finally:
+            if pw is not None:
+                os.seteuid(0)
+                os.setegid(0)
+                os.setgroups(groups)
+        return True
+
+    def profile(self, seconds):
+        """
+        sample the stacks of daemonized process for a number of seconds
+        """
+        request = self._profile_request()
+        if not self._write_profile_request(request, seconds):
+            return False
+        timer0 = time.time()
+        try:
+            if not self._kill(signal.SIGUSR1):
+                return False
+            time.sleep(seconds + 1)
+        finally:
+            os.remove(request)
+        paths = [path for path in glob.glob(self._profile_prefix() + '.*.folded')
+                 if os.path.getmtime(path) >= timer0]
+        for path in sorted(paths):
+            print(path)
+        return bool(paths)
+
+    def start(self, start, stop=None, setup=None, foreground=None, listen=None):
         """
         start daemonized process
         """
@@ -257,6 +632,7 @@ class _Daemon(object):
         self.run = start
         self.setup = setup
         self.terminate = stop
+        self.listen = listen
         self._start(foreground=foreground)
 
 def daemon(*args, **kwargs):
@@ -269,45 +645,148 @@ def daemon(*args, **kwargs):
 # bottle runs
 #
 class _LogMiddleware(object):
-    def __init__(self, app):
+    def __init__(self, app, served=None):
         self.app = app
+        self.served = served
 
     def __call__(self, environ, handler):
 
         def remote():
-            forwarded_for = bottle.request.environ.get("HTTP_X_FORWARDED_FOR", None)
+            forwarded_for = environ.get("HTTP_X_FORWARDED_FOR", None)
             if not forwarded_for:
-                forwarded_for = bottle.request.environ.get("REMOTE_ADDR")
+                forwarded_for = environ.get("REMOTE_ADDR")
             return forwarded_for
 
+        response = {'status': 0, 'length': -1}
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split()[0])
+            for name, value in headers:
+                if name.lower() == 'content-length':
+                    response['length'] = int(value)
+            return handler(status, headers, exc_info)
+
         timer0 = time.time()
+        method = environ.get('REQUEST_METHOD', 'GET').upper()
+        path = '/' + environ.get('PATH_INFO', '').lstrip('/')
         environ['wsgi.errors'] = self
-        ret = self.app(environ, handler)
-        openbar.log.info("%.3f %s %s %i %i %s",
+        environ['openbar.log'] = fields = {}
+        context = openbar.trace.begin(environ)
+        try:
+            ret = self.app(environ, start_response)
+        finally:
+            openbar.trace.end(context, response['status'])
+        openbar.log.info("%.3f %s %s %i %i %s%s",
                           time.time() - timer0,
                           remote(),
-                          bottle.request.method,
-                          bottle.response.status_code,
-                          bottle.response.content_length,
-                          bottle.request.path)
+                          method,
+                          response['status'],
+                          response['length'],
+                          path,
+                          ''.join(' %s=%s' % (key, value)
+                                  for (key, value) in sorted(fields.items())))
+        if self.served is not None:
+            self.served()
         return ret
 
     def write(self, err):
         openbar.log.exception(err)
 
-def run_bottle(action, host, port, packages, **kwargs):
+def _install_admin(root, prefix, installers):
+    """
+    install the statistics endpoints of the unit under prefix, refusing
+    to shadow a route of the application
+    """
+    import bottle
+
+    for name, install in sorted(installers.items()):
+        path = '%s/%s' % (prefix.rstrip('/'), name)
+        try:
+            root.router.match({'PATH_INFO': path, 'REQUEST_METHOD': 'GET'})
+        except bottle.HTTPError:
+            install(root, path)
+            continue
+        raise openbar.exceptions.InvalidConfiguration(
+            "admin endpoint %s conflicts with a route of the application" % (path, ))
+
+def run_bottle(action, host, port, packages, batch_workers=None, flat_routes=False,
+               listen=None, listen_mode=None, listen_group=None,
+               lazy=None, preload=False, backend=None,
+               max_inflight=0, max_queue=0, queue_timeout=1.0, retry_after=1,
+               max_timeout=300.0, admin_prefix=None,
+               slow_query=0.5, slow_query_sample=1.0, n_plus_one=10,
+               task_workers=2, task_queue=1000, task_db_connections=2, wire='json',
+               memory_sample=0.0, trace_sample=0.0, trace_export=None,
+               **kwargs):
+    def _listen(pw):
+        gid = pw.pw_gid
+        if listen_group is not None:
+            gid = grp.getgrnam(listen_group).gr_gid
+        return openbar.listen.listener(listen, host, port,
+                                       uid=pw.pw_uid, gid=gid, mode=listen_mode)
+
     def _start():
+        profiler = None
+        if PROFILE_STARTUP:
+            import openbar.importtime
+            profiler = openbar.importtime.install()
+
+        # heavy imports are deferred to the serving process so that
+        # controlling a unit does not pay for them
+        import bottle
+        from bottle.ext import beaker
+
+        import openbar.admission
+        import openbar.batch
+        import openbar.cache
+        import openbar.client
+        import openbar.dbstats
+        import openbar.deadline
+        import openbar.memtrack
+        import openbar.routes
+        import openbar.server
+        import openbar.tasks
+
+        if backend is not None:
+            openbar.client.set_backend(backend)
+            openbar.client.set_wire(wire)
+
         for package in packages:
             importlib.import_module(package)
+        for (version, name), module in (lazy or {}).items():
+            if preload:
+                importlib.import_module(module)
+            else:
+                openbar.routes.register_lazy(version, name, module)
 
         openbar.log.info("Started")
-        openbar.log.info("Config: host=%s:%i", host, port)
+        openbar.log.info("Config: listen=%s", openbar.listen.describe(runner.listener))
         bottle.BaseRequest.MEMFILE_MAX = 10 * 1024 * 1024
         bottle._stdout = sys.stdout.write
         bottle._stderr = sys.stderr.write
-        app = bottle.app()
-
-        openbar.routes.install_routes(app)
+        root = bottle.app()
+
+        app = openbar.routes.install_routes(root, flat=flat_routes)
+        openbar.admission.configure(max_inflight, max_queue, queue_timeout, retry_after)
+        openbar.deadline.configure(max_timeout)
+        openbar.tasks.configure(task_workers, task_queue, task_db_connections)
+        openbar.dbstats.configure(slow_query, slow_query_sample, n_plus_one)
+        openbar.memtrack.configure(memory_sample)
+        openbar.trace.configure(trace_sample, trace_export, kwargs.get('procname'))
+        if admin_prefix:
+            installers = {
+                'admission': openbar.admission.install_stats,
+                'cache': openbar.cache.install_stats,
+                'tasks': openbar.tasks.install_stats,
+            }
+            if openbar.memtrack.enabled():
+                installers['memory'] = openbar.memtrack.install_stats
+            _install_admin(root, admin_prefix, installers)
+        if batch_workers:
+            openbar.batch.set_workers(batch_workers)
+            openbar.batch.install_batch(root, openbar.tasks.TasksMiddleware(
+                openbar.dbstats.StatsMiddleware(
+                    openbar.deadline.DeadlineMiddleware(
+                        openbar.admission.AdmissionMiddleware(app)))))
 
         session_opts = {
             'session.type': 'file',
@@ -315,28 +794,48 @@ def run_bottle(action, host, port, packages, **kwargs):
             'session.auto': True
         }
         app = beaker.middleware.SessionMiddleware(app, session_opts)
-        bottle.run(app=_LogMiddleware(app),
-                   host=host,
-                   port=port,
-                   server="cherrypy",
-                   quiet=True)
-
+        app = openbar.admission.AdmissionMiddleware(app)
+        app = openbar.deadline.DeadlineMiddleware(app)
+        app = openbar.dbstats.StatsMiddleware(app)
+        app = openbar.tasks.TasksMiddleware(app)
+        if openbar.memtrack.enabled():
+            app = openbar.memtrack.MemoryMiddleware(app, root)
+        if profiler is not None:
+            openbar.importtime.uninstall(profiler)
+            openbar.importtime.report(profiler)
+        runner.ready()
+        try:
+            openbar.server.serve(_LogMiddleware(app, runner.served), runner.listener,
+                                 shutdown_timeout=runner.drain_timeout)
+        finally:
+            # background tasks get what is left of the drain timeout once
+            # the last requests are answered
+            elapsed = time.monotonic() - stopping.get('time', time.monotonic())
+            openbar.tasks.drain(max(1, runner.drain_timeout - elapsed))
+            openbar.trace.flush()
+
+    stopping = {}
     def _stop():
+        stopping['time'] = time.monotonic()
         openbar.log.info("Stopped")
         sys.exit(0)
 
     runner = openbar.run.daemon(**kwargs)
     if action == "restart":
         runner.stop()
-        runner.start(_start, _stop)
+        runner.start(_start, _stop, listen=_listen)
     elif action == 'start':
-        runner.start(_start, _stop)
+        runner.start(_start, _stop, listen=_listen)
     elif action == 'stop':
         runner.stop()
+    elif action == 'reload':
+        runner.reload()
     elif action == 'status':
-        sys.exit(1 - int(daemon.status()))
+        sys.exit(1 - int(runner.status()))
     elif action == 'kill':
         runner.kill()
+    elif action == 'profile':
+        sys.exit(1 - int(runner.profile(PROFILE_SECONDS)))
     else:
         raise ValueError(action)
 
@@ -347,9 +846,35 @@ def run_backend(procname, action="start"):
                             host = config.get('host'),
                             port = config.get('port'),
                             packages = packages,
+                            listen = config.get('listen'),
+                            listen_mode = config.get('listen_mode'),
+                            listen_group = config.get('listen_group'),
+                            flat_routes = config.get('routing') == 'flat',
+                            lazy = config.get('lazy'),
+                            preload = config.get('preload') == 'yes',
+                            max_inflight = config.get('max_inflight'),
+                            max_queue = config.get('max_queue'),
+                            queue_timeout = config.get('queue_timeout'),
+                            retry_after = config.get('retry_after'),
+                            max_timeout = config.get('max_timeout'),
+                            admin_prefix = config.get('admin_prefix'),
+                            slow_query = config.get('slow_query'),
+                            slow_query_sample = config.get('slow_query_sample'),
+                            n_plus_one = config.get('n_plus_one'),
+                            task_workers = config.get('task_workers'),
+                            task_queue = config.get('task_queue'),
+                            task_db_connections = config.get('task_db_connections'),
+                            memory_sample = config.get('memory_sample'),
+                            trace_sample = config.get('trace_sample'),
+                            trace_export = config.get('trace_export'),
+                            batch_workers = config.get('batch_workers'),
                             procname=procname,
                             username=config.get('user'),
-                            pidfile=config.get('pidfile'))
+                            pidfile=config.get('pidfile'),
+                            drain_timeout=config.get('drain_timeout'),
+                            ready_timeout=config.get('ready_timeout'),
+                            max_requests=config.get('max_requests'),
+                            max_rss=config.get('max_rss'))
 
 def run_frontend(procname, action="start"):
     config = openbar.config.get(procname)
@@ -361,6 +886,33 @@ def run_frontend(procname, action="start"):
                             host = config.get('host'),
                             port = config.get('port'),
                             packages = packages,
+                            listen = config.get('listen'),
+                            listen_mode = config.get('listen_mode'),
+                            listen_group = config.get('listen_group'),
+                            backend = config.get('backend'),
+                            wire = config.get('wire'),
+                            flat_routes = config.get('routing') == 'flat',
+                            lazy = config.get('lazy'),
+                            preload = config.get('preload') == 'yes',
+                            max_inflight = config.get('max_inflight'),
+                            max_queue = config.get('max_queue'),
+                            queue_timeout = config.get('queue_timeout'),
+                            retry_after = config.get('retry_after'),
+                            max_timeout = config.get('max_timeout'),
+                            admin_prefix = config.get('admin_prefix'),
+                            slow_query = config.get('slow_query'),
+                            slow_query_sample = config.get('slow_query_sample'),
+                            n_plus_one = config.get('n_plus_one'),
+                            task_workers = config.get('task_workers'),
+                            task_queue = config.get('task_queue'),
+                            task_db_connections = config.get('task_db_connections'),
+                            memory_sample = config.get('memory_sample'),
+                            trace_sample = config.get('trace_sample'),
+                            trace_export = config.get('trace_export'),
                             procname=procname,
                             username=config.get('user'),
-                            pidfile=config.get('pidfile'))
\ No newline at end of file
+                            pidfile=config.get('pidfile'),
+                            drain_timeout=config.get('drain_timeout'),
+                            ready_timeout=config.get('ready_timeout'),
+                            max_requests=config.get('max_requests'),
+                            max_rss=config.get('max_rss'))
\ No newline at end of file
@@ -0,0 +1,106 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+stack sampling profiler writing collapsed stacks
+
+the output has one line per distinct stack, frames from the outermost to
+the innermost separated by semicolons followed by the number of samples,
+as expected by flamegraph.pl and speedscope.
+"""
+
+import collections
+import os
+import sys
+import threading
+import time
+
+import openbar.log
+
+INTERVAL = 0.01
+
+_LOCK = threading.Lock()
+_SAMPLER = None
+
+class _Sampler(threading.Thread):
+    """
+    thread sampling the stacks of every other thread of the process
+    """
+    def __init__(self, seconds, path, interval):
+        super(_Sampler, self).__init__(name='openbar-sampler', daemon=True)
+        self.seconds = seconds
+        self.path = path
+        self.interval = interval
+        self.labels = {}
+
+    def _label(self, code):
+        label = self.labels.get(code)
+        if label is None:
+            label = self.labels[code] = "%s (%s:%i)" % (code.co_name,
+                                                        code.co_filename,
+                                                        code.co_firstlineno)
+        return label
+
+    def _collapse(self, frame):
+        stack = []
+        while frame is not None:
+            stack.append(self._label(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+        return ';'.join(stack)
+
+    def _sample(self):
+        counts = collections.Counter()
+        samples = 0
+        me = threading.get_ident()
+        deadline = time.monotonic() + self.seconds
+        while time.monotonic() < deadline:
+            for ident, frame in sys._current_frames().items():
+                if ident != me:
+                    counts[self._collapse(frame)] += 1
+            samples += 1
+            time.sleep(self.interval)
+        return samples, counts
+
+    def run(self):
+        global _SAMPLER
+        try:
+            openbar.log.info("Profiling for %.1fs into %s", self.seconds, self.path)
+            samples, counts = self._sample()
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w') as output:
+                for stack, count in counts.most_common():
+                    output.write("%s %i\n" % (stack, count))
+            os.rename(tmp, self.path)
+            openbar.log.info("Profiled %i samples of %i stacks into %s",
+                             samples, len(counts), self.path)
+        except:
+            openbar.log.exception("Profiling failed")
+        finally:
+            with _LOCK:
+                _SAMPLER = None
+
+def start(seconds, path, interval=INTERVAL):
+    """
+    sample the process for a number of seconds in the background, return
+    False if a profile is already running
+    """
+    global _SAMPLER
+    with _LOCK:
+        if _SAMPLER is not None:
+            return False
+        sampler = _SAMPLER = _Sampler(seconds, path, interval)
+    sampler.start()
+    return True
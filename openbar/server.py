@@ -0,0 +1,81 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+
+"""
+wsgi server running on a pre-bound listening socket
+"""
+
+import logging
+import time
+
+from cherrypy import wsgiserver
+
+class _Server(wsgiserver.CherryPyWSGIServer):
+    """
+    CherryPy server accepting on a socket bound by the caller
+
+    the socket is duplicated so that stopping the server leaves the
+    caller's socket open and listening.
+    """
+    def __init__(self, sock, wsgi_app, **kwargs):
+        super(_Server, self).__init__(sock.getsockname(), wsgi_app, **kwargs)
+        self.listener = sock
+
+    def start(self):
+        self._interrupt = None
+        if self.software is None:
+            self.software = "%s Server" % self.version
+
+        self.socket = self.listener.dup()
+        self.socket.settimeout(1)
+
+        self.requests.start()
+
+        self.ready = True
+        self._start_time = time.time()
+        while self.ready:
+            try:
+                self.tick()
+            except (KeyboardInterrupt, SystemExit):
+                raise
+            except:
+                # accept() fails once stop() closed the socket
+                if self.ready:
+                    self.error_log("Error in HTTPServer.tick", level=logging.ERROR,
+                                   traceback=True)
+            if self.interrupt:
+                while self.interrupt is True:
+                    time.sleep(0.1)
+                if self.interrupt:
+                    raise self.interrupt
+
+    def stop(self):
+        # CherryPy wakes accept() up by connecting to its own address, which
+        # is the listener shared with the other workers and may be accepted
+        # by one of them. accept() times out every second, closing our
+        # duplicate is enough.
+        self.ready = False
+        sock, self.socket = getattr(self, 'socket', None), None
+        if sock is not None:
+            sock.close()
+        super(_Server, self).stop()
+
+def serve(app, sock, **kwargs):
+    server = _Server(sock, app, **kwargs)
+    try:
+        server.start()
+    finally:
+        server.stop()
@@ -0,0 +1,289 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+background tasks run by the unit outside of its requests
+
+    @app.post('/')
+    def _create():
+        ...
+        openbar.tasks.after_response(audit, user, 'create', db=True)
+        return item
+
+tasks run on a bounded pool of threads with a bounded queue, failed tasks
+are retried with an exponential backoff. Tasks submitted with db=True
+hold one of the database permits of the pool while they run, and their
+connections come from pools of their own sized by these permits, so that
+background work never takes connections away from requests.
+"""
+
+import collections
+import heapq
+import itertools
+import threading
+import time
+
+import openbar.log
+
+WORKERS = 2
+QUEUE = 1000
+DB_CONNECTIONS = 2
+
+_LOCAL = threading.local()
+_EXECUTOR = None
+_EXECUTOR_LOCK = threading.Lock()
+
+def configure(workers, queue, db_connections):
+    """
+    set the size of the pool, of its queue and its database permits
+    """
+    global WORKERS, QUEUE, DB_CONNECTIONS
+    WORKERS = max(1, workers)
+    QUEUE = queue
+    DB_CONNECTIONS = max(1, db_connections)
+
+
+class _Task(object):
+    def __init__(self, func, args, kwargs, retries, backoff, db):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.retries = retries
+        self.backoff = backoff
+        self.db = db
+        self.attempt = 0
+
+    def __repr__(self):
+        return getattr(self.func, '__qualname__', repr(self.func))
+
+
+class _Executor(object):
+    """
+    thread pool running ready tasks, and failed ones once their backoff
+    has elapsed
+    """
+    def __init__(self, workers, queue, db_connections):
+        self.workers = workers
+        self.queue = queue
+        self.permits = threading.BoundedSemaphore(db_connections)
+        self.cond = threading.Condition()
+        self.ready = collections.deque()
+        self.delayed = []
+        self.sequence = itertools.count()
+        self.threads = []
+        self.stopping = False
+        self.running = 0
+        self.counters = dict.fromkeys(['submitted', 'completed', 'failed',
+                                       'retried', 'rejected', 'dropped'], 0)
+        self.busy = 0.0
+
+    def _start(self):
+        # threads are started on first use, never in the master process
+        while len(self.threads) < self.workers:
+            thread = threading.Thread(target=self._worker, daemon=True,
+                                      name='openbar-task-%i' % len(self.threads))
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, task):
+        with self.cond:
+            if self.stopping or len(self.ready) + len(self.delayed) >= self.queue:
+                self.counters['rejected'] += 1
+                return False
+            self.counters['submitted'] += 1
+            self.ready.append(task)
+            self._start()
+            self.cond.notify()
+            return True
+
+    def _next(self):
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                while self.delayed and (self.stopping or self.delayed[0][0] <= now):
+                    self.ready.append(heapq.heappop(self.delayed)[2])
+                if self.ready:
+                    self.running += 1
+                    return self.ready.popleft()
+                if self.stopping:
+                    return None
+                self.cond.wait(self.delayed[0][0] - now if self.delayed else None)
+
+    def _run(self, task):
+        timer0 = time.monotonic()
+        try:
+            if task.db:
+                with self.permits:
+                    _LOCAL.db = True
+                    try:
+                        task.func(*task.args, **task.kwargs)
+                    finally:
+                        _LOCAL.db = False
+            else:
+                task.func(*task.args, **task.kwargs)
+        except:
+            retry = task.attempt < task.retries and not self.stopping
+            openbar.log.exception("Task %r failed, attempt %i%s", task,
+                                  task.attempt + 1, ", retrying" if retry else "")
+            return 'retried' if retry else 'failed'
+        finally:
+            elapsed = time.monotonic() - timer0
+            with self.cond:
+                self.busy += elapsed
+        return 'completed'
+
+    def _worker(self):
+        while True:
+            task = self._next()
+            if task is None:
+                return
+            outcome = self._run(task)
+            with self.cond:
+                self.running -= 1
+                self.counters[outcome] += 1
+                if outcome == 'retried':
+                    delay = task.backoff * (2 ** task.attempt)
+                    task.attempt += 1
+                    heapq.heappush(self.delayed, (time.monotonic() + delay,
+                                                  next(self.sequence), task))
+                self.cond.notify_all()
+
+    def drain(self, timeout):
+        """
+        run the queued tasks for at most timeout seconds, then drop them
+        """
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            self.stopping = True
+            self.cond.notify_all()
+        for thread in self.threads:
+            thread.join(max(0, deadline - time.monotonic()))
+        with self.cond:
+            dropped = len(self.ready) + len(self.delayed)
+            self.ready.clear()
+            self.delayed[:] = []
+            self.counters['dropped'] += dropped
+            self.cond.notify_all()
+        if dropped or self.running:
+            openbar.log.warn("Tasks drained: %i dropped, %i still running",
+                             dropped, self.running)
+        return dropped
+
+    def stats(self):
+        with self.cond:
+            stats = dict(self.counters)
+            stats.update({'workers': self.workers, 'queue': self.queue,
+                          'queued': len(self.ready) + len(self.delayed),
+                          'running': self.running, 'busy': self.busy})
+            return stats
+
+def _executor():
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = _Executor(WORKERS, QUEUE, DB_CONNECTIONS)
+        return _EXECUTOR
+
+def in_db_task():
+    """
+    whether the current thread runs a task submitted with db=True
+    """
+    return getattr(_LOCAL, 'db', False)
+
+def submit(func, *args, retries=0, backoff=1.0, db=False, **kwargs):
+    """
+    run func(*args, **kwargs) in the background, return False if the queue
+    is full
+    """
+    return _executor().submit(_Task(func, args, kwargs, retries, backoff, db))
+
+def after_response(func, *args, retries=0, backoff=1.0, db=False, **kwargs):
+    """
+    run func(*args, **kwargs) in the background once the response of the
+    current request is sent, at once outside of a request
+    """
+    pending = getattr(_LOCAL, 'pending', None)
+    if pending is None:
+        return submit(func, *args, retries=retries, backoff=backoff, db=db, **kwargs)
+    pending.append(_Task(func, args, kwargs, retries, backoff, db))
+    return True
+
+def drain(timeout):
+    """
+    wait for the queued tasks on shutdown, for at most timeout seconds
+    """
+    with _EXECUTOR_LOCK:
+        executor = _EXECUTOR
+    if executor is None:
+        return 0
+    return executor.drain(timeout)
+
+def stats():
+    with _EXECUTOR_LOCK:
+        executor = _EXECUTOR
+    if executor is None:
+        return {}
+    return executor.stats()
+
+
+class _Submit(object):
+    """
+    response body submitting the tasks of its request once sent
+    """
+    def __init__(self, body, tasks):
+        self.body = body
+        self.tasks = tasks
+
+    def __iter__(self):
+        return iter(self.body)
+
+    def close(self):
+        try:
+            if hasattr(self.body, 'close'):
+                self.body.close()
+        finally:
+            tasks, self.tasks = self.tasks, []
+            for task in tasks:
+                if not _executor().submit(task):
+                    openbar.log.warn("Task %r rejected, queue is full", task)
+
+
+class TasksMiddleware(object):
+    """
+    hold the tasks scheduled by a request until its response is sent
+    """
+    def __init__(self, app):
+        self.app = app
+
+    def __call__(self, environ, start_response):
+        # batch sub-requests inherit the tasks of the batch from the environ,
+        # they are submitted once the response of the batch is sent
+        shared = environ.get('openbar.tasks')
+        previous = getattr(_LOCAL, 'pending', None)
+        if shared is None:
+            pending = environ['openbar.tasks'] = []
+        else:
+            pending = shared
+        _LOCAL.pending = pending
+        try:
+            body = self.app(environ, start_response)
+        finally:
+            _LOCAL.pending = previous
+        if shared is not None or not pending:
+            return body
+        return _Submit(body, pending)
+
+def install_stats(root, path='/tasks'):
+    root.route(path, method='GET', callback=stats)
@@ -14,7 +14,9 @@
 # OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
 #
 
-from bottle import jinja2_view
+import functools
+
+import openbar.trace
 
 TEMPLATE_PATH = "templates"
 
@@ -23,4 +25,24 @@ def set_path(path):
    TEMPLATE_PATH = path
 
 def render(template):
-    return jinja2_view(template, template_lookup=[TEMPLATE_PATH])
+    # same as bottle's jinja2_view, with the rendering traced apart from
+    # the handler
+    from bottle import DictMixin, jinja2_template
+
+    # bottle caches compiled templates by the identity of their lookup list
+    lookup = [TEMPLATE_PATH]
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            result = func(*args, **kwargs)
+            if result is None:
+                result = {}
+            elif not isinstance(result, (dict, DictMixin)):
+                return result
+            if not openbar.trace.recording():
+                return jinja2_template(template, result, template_lookup=lookup)
+            with openbar.trace.span('template', template=template):
+                return jinja2_template(template, result, template_lookup=lookup)
+        return wrapper
+    return decorator
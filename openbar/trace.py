@@ -0,0 +1,331 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+request tracing across units
+
+each request carries a W3C traceparent header, assigned by the first unit
+it reaches and forwarded with the backend calls made on its behalf, so
+that the log lines of the frontend and the backend share a trace id. For
+a sample of the traces, spans are recorded for the request, the templates
+rendered, the backend calls and the database queries, and exported in
+batches as Zipkin v2 JSON to a file or a UDP collector.
+
+    with openbar.trace.span('pricing', items=len(items)):
+        ...
+
+Spans are cheap no-ops for requests that are not sampled.
+"""
+
+import json as pyjson
+import os
+import random
+import socket
+import threading
+import time
+
+import openbar.log
+
+HEADER = 'traceparent'
+SAMPLE = 0.0
+EXPORT = None
+SERVICE = 'openbar'
+BATCH = 100
+INTERVAL = 1.0
+QUEUE = 10000
+DATAGRAM = 60000
+
+_LOCAL = threading.local()
+_EXPORTER = None
+_EXPORTER_LOCK = threading.Lock()
+
+def parse_export(value):
+    """
+    target of the export, a file path or udp:host:port
+    """
+    if not value:
+        return None
+    if value.startswith('udp:'):
+        host, _, port = value[4:].rpartition(':')
+        if not host or not port.isdigit():
+            raise ValueError("invalid trace export '%s', expect udp:host:port" % value)
+        return ('udp', (host.strip('[]'), int(port)))
+    return ('file', value)
+
+def configure(sample, export, service=None):
+    """
+    set the fraction of traces started here that are recorded and where
+    their spans are exported, sampling is off without an export
+    """
+    global SAMPLE, EXPORT, SERVICE, _EXPORTER
+    SAMPLE = sample
+    EXPORT = parse_export(export)
+    if service:
+        SERVICE = service
+    with _EXPORTER_LOCK:
+        _EXPORTER = None if EXPORT is None else _Exporter(EXPORT)
+
+def _new_id(bits):
+    return '%0*x' % (bits // 4, random.getrandbits(bits))
+
+
+class _Context(object):
+    """
+    trace of the request handled by the current thread
+    """
+    def __init__(self, trace_id, parent_id, sampled):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.stack = [parent_id]
+        self.previous = None
+        self.root = None
+
+
+class _NoSpan(object):
+    recording = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_, value, traceback):
+        return False
+
+    def tag(self, key, value):
+        pass
+
+NOSPAN = _NoSpan()
+
+
+class _Span(object):
+    recording = True
+
+    def __init__(self, context, name, kind, tags):
+        self.context = context
+        self.name = name
+        self.kind = kind
+        self.tags = tags
+        self.id = _new_id(64)
+        self.parent_id = None
+        self.timestamp = None
+        self.timer0 = None
+
+    def tag(self, key, value):
+        self.tags[key] = value
+
+    def __enter__(self):
+        stack = self.context.stack
+        self.parent_id = stack[-1]
+        stack.append(self.id)
+        self.timestamp = time.time()
+        self.timer0 = time.monotonic()
+        return self
+
+    def __exit__(self, type_, value, traceback):
+        duration = time.monotonic() - self.timer0
+        stack = self.context.stack
+        if stack[-1] == self.id:
+            stack.pop()
+        if type_ is not None:
+            self.tags['error'] = type_.__name__
+        span = {
+            'traceId': self.context.trace_id,
+            'id': self.id,
+            'name': self.name,
+            'timestamp': int(self.timestamp * 1e6),
+            'duration': max(1, int(duration * 1e6)),
+            'localEndpoint': {'serviceName': SERVICE},
+            'tags': dict((key, str(value)) for (key, value) in self.tags.items()),
+        }
+        if self.parent_id is not None:
+            span['parentId'] = self.parent_id
+        if self.kind is not None:
+            span['kind'] = self.kind
+        exporter = _EXPORTER
+        if exporter is not None:
+            exporter.submit(span)
+        return False
+
+def _parse(header):
+    # version-traceid-parentid-flags, anything else starts a new trace
+    parts = header.strip().split('-')
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16)
+        int(parts[2], 16)
+        flags = int(parts[3][:2], 16)
+    except ValueError:
+        return None
+    if parts[1] == '0' * 32 or parts[2] == '0' * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+def begin(environ):
+    """
+    enter the trace of a request, continuing the one of its caller if any
+    """
+    incoming = environ.get('HTTP_TRACEPARENT')
+    parsed = _parse(incoming) if incoming else None
+    if parsed is not None:
+        trace_id, parent_id, sampled = parsed
+    else:
+        trace_id, parent_id = _new_id(128), None
+        sampled = SAMPLE > 0 and random.random() < SAMPLE
+    context = _Context(trace_id, parent_id, sampled and _EXPORTER is not None)
+    context.previous = getattr(_LOCAL, 'context', None)
+    _LOCAL.context = context
+    fields = environ.get('openbar.log')
+    if fields is not None:
+        fields['trace'] = trace_id
+    if context.sampled:
+        path = '/' + environ.get('PATH_INFO', '').lstrip('/')
+        context.root = _Span(context, '%s %s' % (environ.get('REQUEST_METHOD', 'GET'), path),
+                             'SERVER', {'http.path': path})
+        context.root.__enter__()
+    else:
+        context.stack.append(_new_id(64))
+    return context
+
+def end(context, status=None):
+    """
+    leave the trace of a request
+    """
+    try:
+        if context.root is not None:
+            if status:
+                context.root.tag('http.status_code', status)
+            context.root.__exit__(None, None, None)
+    finally:
+        _LOCAL.context = context.previous
+
+def span(name, kind=None, **tags):
+    """
+    context manager timing a span of the current trace
+    """
+    context = getattr(_LOCAL, 'context', None)
+    if context is None or not context.sampled:
+        return NOSPAN
+    return _Span(context, name, kind, tags)
+
+def recording():
+    """
+    whether spans of the current thread are recorded
+    """
+    context = getattr(_LOCAL, 'context', None)
+    return context is not None and context.sampled
+
+def trace_id():
+    context = getattr(_LOCAL, 'context', None)
+    return None if context is None else context.trace_id
+
+def header():
+    """
+    traceparent value for a call made from the current span, None outside
+    of a trace
+    """
+    context = getattr(_LOCAL, 'context', None)
+    if context is None:
+        return None
+    return '00-%s-%s-%s' % (context.trace_id, context.stack[-1],
+                            '01' if context.sampled else '00')
+
+
+class _Exporter(object):
+    """
+    thread sending the finished spans in batches
+    """
+    def __init__(self, target):
+        self.target = target
+        self.cond = threading.Condition()
+        self.spans = []
+        self.thread = None
+        self.pid = None
+        self.dropped = 0
+
+    def submit(self, span):
+        with self.cond:
+            if len(self.spans) >= QUEUE:
+                self.dropped += 1
+                return
+            self.spans.append(span)
+            # threads do not survive fork, the exporter is started by the
+            # process recording spans
+            if self.pid != os.getpid():
+                self.pid = os.getpid()
+                self.thread = threading.Thread(target=self._run, daemon=True,
+                                               name='openbar-trace')
+                self.thread.start()
+            if len(self.spans) >= BATCH:
+                self.cond.notify()
+
+    def _take(self):
+        with self.cond:
+            spans, self.spans = self.spans, []
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            openbar.log.warn("Trace export queue full, %i spans dropped", dropped)
+        return spans
+
+    def _run(self):
+        while True:
+            with self.cond:
+                if len(self.spans) < BATCH:
+                    self.cond.wait(INTERVAL)
+            spans = self._take()
+            if spans:
+                self._export(spans)
+
+    def _export(self, spans):
+        kind, target = self.target
+        try:
+            if kind == 'file':
+                with open(target, 'a') as output:
+                    output.write(pyjson.dumps(spans, separators=(',', ':')) + '\n')
+                return
+            with socket.socket(socket.AF_INET6 if ':' in target[0] else socket.AF_INET,
+                               socket.SOCK_DGRAM) as sock:
+                for datagram in self._datagrams(spans):
+                    sock.sendto(datagram, target)
+        except OSError as exc:
+            openbar.log.warn("Trace export failed, %i spans lost: %s", len(spans), exc)
+
+    @staticmethod
+    def _datagrams(spans):
+        # each datagram is a JSON array of spans, as POSTed to a collector
+        encoded = [pyjson.dumps(span, separators=(',', ':')).encode('utf-8')
+                   for span in spans]
+        chunk, size = [], 2
+        for span in encoded:
+            if chunk and size + len(span) + 1 > DATAGRAM:
+                yield b'[' + b','.join(chunk) + b']'
+                chunk, size = [], 2
+            chunk.append(span)
+            size += len(span) + 1
+        if chunk:
+            yield b'[' + b','.join(chunk) + b']'
+
+    def flush(self):
+        spans = self._take()
+        if spans:
+            self._export(spans)
+
+def flush():
+    """
+    export the spans not sent yet, on shutdown
+    """
+    with _EXPORTER_LOCK:
+        exporter = _EXPORTER
+    if exporter is not None:
+        exporter.flush()
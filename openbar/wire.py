@@ -0,0 +1,136 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+wire formats exchanged between units
+
+JSON is the default, MessagePack is used when the msgpack package is
+installed and the peer asks for it. Numeric arrays (array.array, 1-D
+numpy arrays) are sent as raw machine values in a single MessagePack
+extension and decoded into array.array with one copy of the buffer,
+without going through one object per element. Decoded arrays may be
+wrapped with numpy.frombuffer() without copying.
+"""
+
+import array
+import json as pyjson
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = 'application/json'
+MSGPACK = 'application/msgpack'
+
+_MSGPACK_TYPES = (MSGPACK, 'application/x-msgpack')
+_EXT_ARRAY = 1
+_FORMATS = frozenset('bBhHiIlLqQfd')
+
+def available():
+    return msgpack is not None
+
+def is_msgpack(content_type):
+    return (content_type or '').split(';')[0].strip().lower() in _MSGPACK_TYPES
+
+def negotiate(accept):
+    """
+    format of a response given the Accept header of the request
+    """
+    if msgpack is None or not accept:
+        return JSON
+    best, best_q = JSON, 0.0
+    for item in accept.split(','):
+        params = item.split(';')
+        media = params[0].strip().lower()
+        q = 1.0
+        for param in params[1:]:
+            key, _, value = param.partition('=')
+            if key.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media in _MSGPACK_TYPES and q > best_q:
+            best, best_q = MSGPACK, q
+        elif media in (JSON, 'application/*', '*/*') and q > best_q:
+            best, best_q = JSON, q
+    return best
+
+def _flat(obj):
+    """
+    native format and raw bytes of a 1-D numeric array, None otherwise
+    """
+    if isinstance(obj, array.array):
+        if obj.typecode == 'u':
+            return None
+        return obj.typecode, memoryview(obj)
+    try:
+        view = memoryview(obj)
+    except TypeError:
+        return None
+    if view.ndim != 1 or not view.c_contiguous or view.format not in _FORMATS:
+        return None
+    return view.format, view
+
+def _json_default(obj):
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError("%r is not JSON serializable" % (obj, ))
+
+def _msgpack_default(obj):
+    flat = _flat(obj)
+    if flat is not None:
+        fmt, view = flat
+        return msgpack.ExtType(_EXT_ARRAY, fmt.encode('ascii') + view.cast('B'))
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError("%r is not MessagePack serializable" % (obj, ))
+
+def _ext_hook(code, data):
+    if code == _EXT_ARRAY:
+        if not data or chr(data[0]) not in _FORMATS:
+            raise ValueError("invalid array extension")
+        # msgpack packs memoryviews as raw bytes, an array keeps its type
+        # when it is encoded again
+        values = array.array(chr(data[0]))
+        values.frombytes(memoryview(data)[1:])
+        return values
+    return msgpack.ExtType(code, data)
+
+def dumps(data, content_type=JSON):
+    """
+    encode data in the given format
+    """
+    if is_msgpack(content_type):
+        return msgpack.packb(data, default=_msgpack_default, use_bin_type=True)
+    return pyjson.dumps(data, default=_json_default).encode('utf-8')
+
+def loads(payload, content_type=JSON):
+    """
+    decode a payload in the given format, raise ValueError if it is invalid
+    """
+    if is_msgpack(content_type):
+        if msgpack is None:
+            raise ValueError("msgpack is not installed")
+        try:
+            return msgpack.unpackb(payload, raw=False, ext_hook=_ext_hook,
+                                   strict_map_key=False)
+        except (ValueError, TypeError, msgpack.UnpackException) as exc:
+            # unhashable map keys raise TypeError
+            raise ValueError("invalid msgpack payload: %s" % (exc, )) from exc
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        payload = bytes(payload).decode('utf-8')
+    return pyjson.loads(payload)
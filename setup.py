@@ -42,6 +42,7 @@ CONFIGURATION = {
 	'jinja2==2.11.2',
     'psycopg2-binary',
     ],
+    'extras_require':   {'msgpack': ['msgpack']},
     'packages':         ['openbar'],
     'package_data':     {'openbar' : [
     ]},
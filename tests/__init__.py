@@ -0,0 +1,71 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+tests of the openbar package
+
+    $ python -m pytest tests
+"""
+
+import io
+import json as pyjson
+
+
+def request(app, method, path, body=None, headers=None):
+    """
+    call a wsgi application, return its status, headers and body
+
+    body is sent as JSON unless it is bytes already.
+    """
+    path, _, query = path.partition('?')
+    data = body
+    if not isinstance(body, bytes):
+        data = b'' if body is None else pyjson.dumps(body).encode('utf-8')
+    environ = {
+        'REQUEST_METHOD': method,
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(data)),
+        'wsgi.input': io.BytesIO(data),
+        'wsgi.errors': io.StringIO(),
+        'wsgi.url_scheme': 'http',
+        'wsgi.version': (1, 0),
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for (key, value) in (headers or {}).items():
+        key = key.upper().replace('-', '_')
+        if key != 'CONTENT_TYPE':
+            key = 'HTTP_' + key
+        environ[key] = value
+
+    result = {}
+    def start_response(status, headers, exc_info=None):
+        result['status'] = int(status.split()[0])
+        result['headers'] = dict(headers)
+
+    body = app(environ, start_response)
+    try:
+        data = b''.join(body)
+    finally:
+        if hasattr(body, 'close'):
+            body.close()
+    return result['status'], result['headers'], data
@@ -0,0 +1,141 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+tests of admission control
+"""
+
+import threading
+import time
+import unittest
+
+import openbar.admission
+import openbar.routes
+
+from tests import request
+
+
+def _app(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [b'ok']
+
+def _close(body):
+    if hasattr(body, 'close'):
+        body.close()
+
+
+class GateTest(unittest.TestCase):
+    def test_limit(self):
+        gate = openbar.admission._Gate(2, 0)
+        self.assertTrue(gate.enter(0))
+        self.assertTrue(gate.enter(0))
+        self.assertFalse(gate.enter(1.0))
+        gate.leave()
+        self.assertTrue(gate.enter(0))
+        stats = gate.stats()
+        self.assertEqual((stats['inflight'], stats['admitted'], stats['shed']), (2, 3, 1))
+
+    def test_queue(self):
+        gate = openbar.admission._Gate(1, 1)
+        self.assertTrue(gate.enter(0))
+        admitted = []
+        waiter = threading.Thread(target=lambda: admitted.append(gate.enter(10.0)))
+        waiter.start()
+        while gate.stats()['waiting'] == 0:
+            time.sleep(0.01)
+        # the queue holds a single request
+        self.assertFalse(gate.enter(10.0))
+        gate.leave()
+        waiter.join()
+        self.assertEqual(admitted, [True])
+        self.assertEqual(gate.stats()['inflight'], 1)
+
+    def test_queue_timeout(self):
+        gate = openbar.admission._Gate(1, 1)
+        self.assertTrue(gate.enter(0))
+        timer0 = time.monotonic()
+        self.assertFalse(gate.enter(0.05))
+        self.assertGreaterEqual(time.monotonic() - timer0, 0.05)
+        stats = gate.stats()
+        self.assertEqual((stats['waiting'], stats['shed']), (0, 1))
+
+    def test_low_priority_does_not_wait(self):
+        gate = openbar.admission._Gate(1, 10)
+        self.assertTrue(gate.enter(0))
+        self.assertFalse(gate.enter(10.0, may_wait=False))
+
+
+class AdmissionMiddlewareTest(unittest.TestCase):
+    def setUp(self):
+        openbar.admission.configure(1, 0, 0.01, 7)
+        self.app = openbar.admission.AdmissionMiddleware(_app)
+
+    def tearDown(self):
+        openbar.admission.configure(0, 0, 1.0, 1)
+        for name in ('normal', 'low', 'critical', 'wide'):
+            openbar.routes._ROUTES.pop(('9.0', name), None)
+            openbar.admission._GATES.pop(('9.0', name), None)
+
+    def register(self, name, **kwargs):
+        openbar.routes.register('9.0', name, **kwargs)(lambda app: None)
+
+    def hold(self, path):
+        # the slot is held until the response body is closed
+        result = {}
+        def start_response(status, headers, exc_info=None):
+            result['status'] = status
+        body = self.app({'PATH_INFO': path, 'REQUEST_METHOD': 'GET'}, start_response)
+        self.assertTrue(result['status'].startswith('200'))
+        return body
+
+    def test_shed(self):
+        self.register('normal')
+        body = self.hold('/9.0/normal/items')
+        status, headers, _ = request(self.app, 'GET', '/9.0/normal/items')
+        self.assertEqual(status, 503)
+        self.assertEqual(headers['Retry-After'], '7')
+        # shed requests are flagged in the access log
+        environ = {'PATH_INFO': '/9.0/normal/items', 'REQUEST_METHOD': 'GET'}
+        self.app(environ, lambda status, headers, exc_info=None: None)
+        self.assertEqual(environ['openbar.log'], {'shed': 1})
+        body.close()
+        status, _, data = request(self.app, 'GET', '/9.0/normal/items')
+        self.assertEqual((status, data), (200, b'ok'))
+        self.assertEqual(openbar.admission.stats()['/9.0/normal/']['shed'], 2)
+
+    def test_mount_options(self):
+        self.register('wide', concurrency=2)
+        self.register('critical', priority=openbar.admission.CRITICAL)
+        bodies = [self.hold('/9.0/wide/'), self.hold('/9.0/wide/')]
+        self.assertEqual(request(self.app, 'GET', '/9.0/wide/')[0], 503)
+        bodies.extend(self.hold('/9.0/critical/') for _ in range(3))
+        for body in bodies:
+            _close(body)
+        self.assertNotIn('/9.0/critical/', openbar.admission.stats())
+
+    def test_low_priority(self):
+        openbar.admission.configure(1, 10, 10.0, 1)
+        self.register('low', priority=openbar.admission.LOW)
+        body = self.hold('/9.0/low/')
+        timer0 = time.monotonic()
+        self.assertEqual(request(self.app, 'GET', '/9.0/low/')[0], 503)
+        self.assertLess(time.monotonic() - timer0, 1.0)
+        body.close()
+
+    def test_unregistered(self):
+        bodies = [self.hold('/9.0/unknown/') for _ in range(3)]
+        bodies.append(self.hold('/batch'))
+        for body in bodies:
+            _close(body)
@@ -0,0 +1,137 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+tests of the batch endpoint
+"""
+
+import json as pyjson
+import time
+import unittest
+
+import bottle
+
+import openbar.batch
+import openbar.deadline
+import openbar.params
+
+from tests import request
+
+
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        self.app = bottle.Bottle()
+        self.app.install(openbar.params.WirePlugin())
+
+        @self.app.get('/1.0/items/<item:int>')
+        def _get(item):
+            return {'id': item}
+
+        @self.app.post('/1.0/items/')
+        def _create():
+            with openbar.params.json() as params:
+                name = params.string('name')
+            return {'name': name}
+
+        @self.app.get('/1.0/fail')
+        def _fail():
+            raise RuntimeError('boom')
+
+        @self.app.get('/1.0/missing')
+        def _missing():
+            openbar.params.error(404)
+
+        openbar.batch.install_batch(self.app)
+
+    def batch(self, requests, **kwargs):
+        kwargs['requests'] = requests
+        return request(self.app, 'POST', '/batch', kwargs)
+
+    def test_dispatch(self):
+        status, _, body = self.batch([
+            {'path': '/1.0/items/1'},
+            {'method': 'POST', 'path': '/1.0/items/', 'body': {'name': 'foo'}},
+            {'path': '/1.0/items/2?unused=1'},
+        ])
+        self.assertEqual(status, 200)
+        responses = pyjson.loads(body)['responses']
+        self.assertEqual([response['status'] for response in responses], [200, 200, 200])
+        self.assertEqual([response['body'] for response in responses],
+                         [{'id': 1}, {'name': 'foo'}, {'id': 2}])
+
+    def test_errors_are_isolated(self):
+        status, _, body = self.batch([
+            {'path': '/1.0/fail'},
+            {'path': '/1.0/items/1'},
+            {'path': '/1.0/missing'},
+            {'method': 'POST', 'path': '/1.0/items/', 'body': {'name': 42}},
+            {'path': '/1.0/items/3'},
+        ], parallel=True)
+        self.assertEqual(status, 200)
+        responses = pyjson.loads(body)['responses']
+        self.assertEqual([response['status'] for response in responses],
+                         [500, 200, 404, 400, 200])
+        self.assertEqual(responses[1]['body'], {'id': 1})
+        self.assertEqual(responses[4]['body'], {'id': 3})
+
+    def test_parallel(self):
+        requests = [{'path': '/1.0/items/%i' % i} for i in range(5)]
+        for parallel in (False, True, 1, 2, 5):
+            status, _, body = self.batch(requests, parallel=parallel)
+            self.assertEqual(status, 200)
+            self.assertEqual([response['body']['id']
+                              for response in pyjson.loads(body)['responses']],
+                             list(range(5)))
+
+    def test_invalid_parallel(self):
+        requests = [{'path': '/1.0/items/1'}]
+        for parallel in ('yes', 0, -1, openbar.batch.MAX_REQUESTS + 1, 1.5):
+            status, _, _ = self.batch(requests, parallel=parallel)
+            self.assertEqual(status, 400, parallel)
+
+    def test_invalid_requests(self):
+        for requests in ([{'path': 'relative'}], [{'path': '/batch'}], ['/1.0/items/1'],
+                         [{'path': '/1.0/items/1'}] * (openbar.batch.MAX_REQUESTS + 1)):
+            status, _, _ = self.batch(requests)
+            self.assertEqual(status, 400, requests)
+
+
+class BatchDeadlineTest(unittest.TestCase):
+    def setUp(self):
+        self.remaining = []
+        root = bottle.Bottle()
+        root.install(openbar.params.WirePlugin())
+
+        @root.get('/1.0/slow')
+        def _slow():
+            self.remaining.append(openbar.deadline.remaining())
+            time.sleep(0.2)
+            return {}
+
+        # as set up by run_bottle, sub-requests go through the middlewares
+        self.app = openbar.deadline.DeadlineMiddleware(root)
+        openbar.batch.install_batch(root, self.app)
+
+    def test_deadline(self):
+        status, _, body = request(self.app, 'POST', '/batch',
+                                  {'requests': [{'path': '/1.0/slow'}] * 3},
+                                  headers={'X-Openbar-Timeout': '0.3'})
+        self.assertEqual(status, 200)
+        responses = pyjson.loads(body)['responses']
+        self.assertEqual([response['status'] for response in responses], [200, 200, 504])
+        # the third sub-request started past the deadline and was not run
+        self.assertEqual(len(self.remaining), 2)
+        self.assertTrue(0.2 < self.remaining[0] <= 0.3)
+        self.assertTrue(0 < self.remaining[1] <= 0.1)
@@ -0,0 +1,136 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+tests of the shared cache
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import openbar.cache
+import openbar.exceptions
+
+
+class CacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'cache')
+        self.cache = openbar.cache.Cache(self.path, 64, 256, 4)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_values(self):
+        self.assertTrue(self.cache.set('bytes', b'\x00\xff'))
+        self.assertTrue(self.cache.set(b'str', 'caf\xe9'))
+        self.assertTrue(self.cache.set_json('json', {'a': [1, 2]}))
+        self.assertEqual(self.cache.get('bytes'), b'\x00\xff')
+        self.assertEqual(self.cache.get('str'), 'caf\xe9')
+        self.assertEqual(self.cache.get('json'), {'a': [1, 2]})
+        self.assertIsNone(self.cache.get('missing'))
+        self.assertEqual(self.cache.get('missing', 42), 42)
+        self.assertRaises(TypeError, self.cache.set, 'int', 42)
+        self.assertRaises(TypeError, self.cache.get, 42)
+
+    def test_overwrite_and_delete(self):
+        self.cache.set('key', 'first')
+        self.cache.set('key', 'second')
+        self.assertEqual(self.cache.get('key'), 'second')
+        self.assertEqual(self.cache.stats()['used'], 1)
+        self.assertTrue(self.cache.delete('key'))
+        self.assertFalse(self.cache.delete('key'))
+        self.assertIsNone(self.cache.get('key'))
+        self.assertEqual(self.cache.stats()['used'], 0)
+
+    def test_ttl(self):
+        self.cache.set('short', 'value', ttl=0.05)
+        self.cache.set('long', 'value', ttl=60)
+        self.assertEqual(self.cache.get('short'), 'value')
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get('short'))
+        self.assertEqual(self.cache.get('long'), 'value')
+        self.assertEqual(self.cache.stats()['expired'], 1)
+
+    def test_oversize(self):
+        self.assertFalse(self.cache.set('big', b'x' * 256))
+        self.assertIsNone(self.cache.get('big'))
+        self.assertEqual(self.cache.get_or_set('big', lambda: 'y' * 300), 'y' * 300)
+        self.assertIsNone(self.cache.get('big'))
+
+    def test_eviction(self):
+        for i in range(1000):
+            self.cache.set('key%i' % i, 'value%i' % i)
+        stats = self.cache.stats()
+        self.assertLessEqual(stats['used'], self.cache.slots)
+        self.assertGreater(stats['evictions'], 0)
+        self.assertEqual(self.cache.get('key999'), 'value999')
+
+    def test_get_or_set(self):
+        calls = []
+        def compute():
+            calls.append(True)
+            return {'n': len(calls)}
+        self.assertEqual(self.cache.get_or_set('key', compute), {'n': 1})
+        self.assertEqual(self.cache.get_or_set('key', compute), {'n': 1})
+        self.assertEqual(len(calls), 1)
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_clear(self):
+        self.cache.set('key', 'value')
+        self.cache.clear()
+        self.assertIsNone(self.cache.get('key'))
+        self.assertEqual(self.cache.stats()['used'], 0)
+
+    def test_persistence(self):
+        self.cache.set('key', 'value')
+        reopened = openbar.cache.Cache(self.path, 64, 256, 4)
+        try:
+            self.assertEqual(reopened.get('key'), 'value')
+        finally:
+            reopened.close()
+        self.assertRaises(openbar.exceptions.InvalidConfiguration,
+                          openbar.cache.Cache, self.path, 128, 256, 4)
+
+    def test_processes(self):
+        self.cache.set('parent', 'value')
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                child = openbar.cache.Cache(self.path, 64, 256, 4)
+                if child.get('parent') == 'value':
+                    for i in range(100):
+                        child.set('child%i' % i, 'value%i' % i)
+                    status = 0
+            finally:
+                os._exit(status)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.WEXITSTATUS(status), 0)
+        self.assertEqual(self.cache.get('child99'), 'value99')
+        self.assertGreaterEqual(self.cache.stats()['sets'], 101)
+
+    def test_open(self):
+        cache = openbar.cache.open(os.path.join(self.tmpdir, 'shared'))
+        try:
+            self.assertIs(openbar.cache.open(os.path.join(self.tmpdir, 'shared')), cache)
+            self.assertIn(cache.path, openbar.cache.stats())
+        finally:
+            openbar.cache._CACHES.pop(cache.path).close()
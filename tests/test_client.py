@@ -0,0 +1,263 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+tests of the client frontends use to call their backend
+"""
+
+import http.client
+import socket
+import threading
+import time
+import unittest
+import wsgiref.simple_server
+
+import bottle
+
+import openbar.batch
+import openbar.client
+import openbar.deadline
+import openbar.exceptions
+import openbar.params
+
+
+class _Handler(wsgiref.simple_server.WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class _RawServer(threading.Thread):
+    """
+    server answering each connection with the next scripted reply, then
+    closing it
+    """
+    def __init__(self, replies):
+        super(_RawServer, self).__init__(daemon=True)
+        self.replies = list(replies)
+        self.requests = []
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(8)
+        self.url = 'http://127.0.0.1:%i' % self.sock.getsockname()[1]
+
+    def run(self):
+        while self.replies:
+            conn, _ = self.sock.accept()
+            with conn:
+                data = b''
+                while b'\r\n\r\n' not in data:
+                    chunk = conn.recv(65536)
+                    if not chunk:
+                        break
+                    data += chunk
+                if data:
+                    self.requests.append(data.split(b'\r\n', 1)[0].decode('latin1'))
+                conn.sendall(self.replies.pop(0))
+
+    def close(self):
+        self.sock.close()
+
+def _reply(body=b'{}'):
+    return (b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+            b'Content-Length: %i\r\n\r\n%s' % (len(body), body))
+
+
+class ClientTest(unittest.TestCase):
+    def setUp(self):
+        self.paths = []
+        app = bottle.Bottle()
+        app.install(openbar.params.WirePlugin())
+
+        @app.hook('before_request')
+        def _count():
+            if not bottle.request.environ.get('openbar.batched'):
+                self.paths.append(bottle.request.path)
+
+        @app.get('/1.0/items/<item:int>')
+        def _get(item):
+            return {'id': item}
+
+        @app.post('/1.0/items/')
+        def _create():
+            with openbar.params.json() as params:
+                return {'name': params.string('name')}
+
+        @app.get('/1.0/missing')
+        def _missing():
+            openbar.params.error(404)
+
+        def target(environ, start_response):
+            environ['openbar.batched'] = True
+            return app(environ, start_response)
+        openbar.batch.install_batch(app, target)
+
+        self.server = wsgiref.simple_server.make_server('127.0.0.1', 0, app,
+                                                        handler_class=_Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.01, ),
+                                       daemon=True)
+        self.thread.start()
+        openbar.client.set_backend('http://127.0.0.1:%i' % self.server.server_port)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        openbar.client.set_backend(None)
+        openbar.client._LOCAL.connections = {}
+
+    def test_calls(self):
+        self.assertEqual(openbar.client.get('/1.0/items/42'), {'id': 42})
+        self.assertEqual(openbar.client.post('/1.0/items/', {'name': 'foo'}), {'name': 'foo'})
+        with self.assertRaises(openbar.exceptions.BackendError) as caught:
+            openbar.client.get('/1.0/missing')
+        self.assertEqual(caught.exception.status, 404)
+
+    def test_no_backend(self):
+        openbar.client.set_backend(None)
+        self.assertRaises(openbar.exceptions.InvalidConfiguration,
+                          openbar.client.get, '/1.0/items/1')
+
+    def test_batch(self):
+        with openbar.client.batch(parallel=2):
+            first = openbar.client.get('/1.0/items/1')
+            missing = openbar.client.get('/1.0/missing')
+            created = openbar.client.post('/1.0/items/', {'name': 'foo'})
+            self.assertIsInstance(first, openbar.client.Pending)
+        self.assertEqual(self.paths, ['/batch'])
+        self.assertEqual(first.result, {'id': 1})
+        self.assertEqual(created.result, {'name': 'foo'})
+        with self.assertRaises(openbar.exceptions.BackendError) as caught:
+            missing.result
+        self.assertEqual(caught.exception.status, 404)
+
+    def test_batch_single(self):
+        with openbar.client.batch():
+            item = openbar.client.get('/1.0/items/1')
+        self.assertEqual(self.paths, ['/1.0/items/1'])
+        self.assertEqual(item.result, {'id': 1})
+
+    def test_batch_resolved_early(self):
+        with openbar.client.batch():
+            first = openbar.client.get('/1.0/items/1')
+            second = openbar.client.get('/1.0/items/2')
+            # reading a result sends what was queued so far
+            self.assertEqual(first.result, {'id': 1})
+            third = openbar.client.get('/1.0/items/3')
+        self.assertEqual(self.paths, ['/batch', '/1.0/items/3'])
+        self.assertEqual((second.result, third.result), ({'id': 2}, {'id': 3}))
+
+    def test_batch_failed(self):
+        server = _RawServer([b'garbage\r\n'])
+        server.start()
+        openbar.client.set_backend(server.url)
+        try:
+            with self.assertRaises(Exception) as caught:
+                with openbar.client.batch():
+                    first = openbar.client.get('/1.0/items/1')
+                    second = openbar.client.get('/1.0/items/2')
+            for pending in (first, second):
+                with self.assertRaises(Exception) as failed:
+                    pending.result
+                self.assertIs(failed.exception, caught.exception)
+        finally:
+            server.close()
+
+    def test_batch_incomplete(self):
+        server = _RawServer([_reply(b'{"responses": []}')])
+        server.start()
+        openbar.client.set_backend(server.url)
+        try:
+            with self.assertRaises(openbar.exceptions.BackendError) as caught:
+                with openbar.client.batch():
+                    first = openbar.client.get('/1.0/items/1')
+                    openbar.client.get('/1.0/items/2')
+            self.assertEqual(caught.exception.status, 502)
+            self.assertRaises(openbar.exceptions.BackendError, lambda: first.result)
+        finally:
+            server.close()
+
+
+class RetryTest(unittest.TestCase):
+    def tearDown(self):
+        openbar.client.set_backend(None)
+        openbar.client._LOCAL.connections = {}
+
+    def stale(self, replies):
+        # the first connection is closed by the server after one exchange
+        server = _RawServer(replies)
+        server.start()
+        self.addCleanup(server.close)
+        openbar.client.set_backend(server.url)
+        self.assertEqual(openbar.client.get('/first'), {})
+        time.sleep(0.05)
+        return server
+
+    def test_idempotent(self):
+        server = self.stale([_reply(), _reply(b'{"retried": true}')])
+        self.assertEqual(openbar.client.get('/second'), {'retried': True})
+        self.assertEqual(server.requests, ['GET /first HTTP/1.1', 'GET /second HTTP/1.1'])
+
+    def test_not_idempotent(self):
+        server = self.stale([_reply(), _reply()])
+        self.assertRaises(ConnectionError, openbar.client.post, '/second', {})
+        self.assertEqual(server.requests, ['GET /first HTTP/1.1'])
+
+    def test_broken_connection(self):
+        # a connection failing mid-exchange is not reused by the thread
+        server = _RawServer([b'garbage\r\n', _reply(b'{"next": true}')])
+        server.start()
+        self.addCleanup(server.close)
+        openbar.client.set_backend(server.url)
+        self.assertRaises(http.client.BadStatusLine, openbar.client.get, '/first')
+        self.assertEqual(openbar.client._LOCAL.connections, {})
+        self.assertEqual(openbar.client.post('/second', {}), {'next': True})
+
+    def test_idempotent_batch(self):
+        server = self.stale([_reply(), _reply(b'{"responses": [{"status": 200, "body": 1},'
+                                              b' {"status": 200, "body": 2}]}')])
+        with openbar.client.batch():
+            first = openbar.client.get('/1')
+            second = openbar.client.get('/2')
+        self.assertEqual((first.result, second.result), (1, 2))
+        self.assertEqual(server.requests[-1], 'POST /batch HTTP/1.1')
+
+
+class TimeoutTest(unittest.TestCase):
+    def setUp(self):
+        # the backend accepts connections and never answers
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(8)
+        openbar.client.set_backend('http://127.0.0.1:%i' % self.sock.getsockname()[1])
+
+    def tearDown(self):
+        openbar.deadline.clear()
+        openbar.client.set_backend(None)
+        openbar.client._LOCAL.connections = {}
+        self.sock.close()
+
+    def test_deadline(self):
+        openbar.deadline.start(0.2)
+        timer0 = time.monotonic()
+        self.assertRaises(openbar.exceptions.DeadlineExceeded,
+                          openbar.client.get, '/1.0/items/1')
+        self.assertLess(time.monotonic() - timer0, 1.0)
+        self.assertTrue(openbar.deadline.missed())
+        self.assertEqual(openbar.client._LOCAL.connections, {})
+
+    def test_past_deadline(self):
+        openbar.deadline.start(0.01)
+        time.sleep(0.02)
+        self.assertRaises(openbar.exceptions.DeadlineExceeded,
+                          openbar.client.get, '/1.0/items/1')
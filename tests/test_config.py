@@ -0,0 +1,165 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+tests of the configuration parser
+"""
+
+import configparser
+import os
+import shutil
+import tempfile
+import unittest
+
+import openbar.config
+import openbar.exceptions
+
+_BACKEND = """
+[backend]
+type = backend
+user = _openbar
+secret = secret
+frontend = http://127.0.0.1:7071
+packages = myproject
+pidfile = /var/run/openbar/backend.pid
+host = 127.0.0.1
+port = 7070
+"""
+
+
+def _section(**options):
+    config = configparser.RawConfigParser()
+    config['unit'] = options
+    return config['unit']
+
+
+class ParseTest(unittest.TestCase):
+    def parse(self, func, *args, **options):
+        tmp = {}
+        func('openbar.conf', 'backend', _section(**options), tmp, *args)
+        return tmp
+
+    def assertInvalid(self, func, *args, **options):
+        self.assertRaises(openbar.exceptions.InvalidConfiguration,
+                          self.parse, func, *args, **options)
+
+    def test_int(self):
+        parse_int = openbar.config.parse_int
+        self.assertEqual(self.parse(parse_int, 'workers', 4), {'workers': 4})
+        self.assertEqual(self.parse(parse_int, 'workers', 4, workers='8'), {'workers': 8})
+        self.assertInvalid(parse_int, 'workers', 4, workers='many')
+        self.assertInvalid(parse_int, 'workers', 4, workers='1.5')
+
+    def test_float(self):
+        parse_float = openbar.config.parse_float
+        self.assertEqual(self.parse(parse_float, 'timeout', 1.0), {'timeout': 1.0})
+        self.assertEqual(self.parse(parse_float, 'timeout', 1.0, timeout='0.25'),
+                         {'timeout': 0.25})
+        self.assertInvalid(parse_float, 'timeout', 1.0, timeout='soon')
+
+    def test_choice(self):
+        parse_choice = openbar.config.parse_choice
+        choices = ['mount', 'flat']
+        self.assertEqual(self.parse(parse_choice, 'routing', choices), {'routing': 'mount'})
+        self.assertEqual(self.parse(parse_choice, 'routing', choices, routing='flat'),
+                         {'routing': 'flat'})
+        self.assertInvalid(parse_choice, 'routing', choices, routing='Flat')
+
+    def test_lazy(self):
+        parse_lazy = openbar.config.parse_lazy
+        self.assertEqual(self.parse(parse_lazy), {'lazy': {}, 'preload': 'no'})
+        tmp = self.parse(parse_lazy, lazy='1.0/users:project.users\n 1.1/users:project.users',
+                         preload='yes')
+        self.assertEqual(tmp, {'lazy': {('1.0', 'users'): 'project.users',
+                                        ('1.1', 'users'): 'project.users'},
+                               'preload': 'yes'})
+        for lazy in ('1.0/users', '1.0:project.users', '/users:project.users',
+                     '1.0/users/admin:project.users', '1.0/users:'):
+            self.assertInvalid(parse_lazy, lazy=lazy)
+        self.assertInvalid(parse_lazy, preload='maybe')
+
+    def test_listen(self):
+        parse_listen = openbar.config.parse_listen
+        self.assertEqual(self.parse(parse_listen, host='127.0.0.1', port='7070'),
+                         {'host': '127.0.0.1', 'port': 7070})
+        self.assertInvalid(parse_listen, host='127.0.0.1')
+        self.assertInvalid(parse_listen, host='127.0.0.1', port='http')
+        self.assertEqual(self.parse(parse_listen, listen='unix:/run/openbar.sock',
+                                    listen_mode='0600', listen_group='_openbar'),
+                         {'listen': 'unix:/run/openbar.sock', 'host': None, 'port': None,
+                          'listen_mode': 0o600, 'listen_group': '_openbar'})
+        self.assertEqual(self.parse(parse_listen, listen='fd:3')['listen_mode'], 0o660)
+        self.assertEqual(self.parse(parse_listen, listen='systemd')['listen'], 'systemd')
+        for listen in ('unix:', 'fd:three', 'tcp:7070'):
+            self.assertInvalid(parse_listen, listen=listen)
+        self.assertInvalid(parse_listen, listen='fd:3', listen_mode='rw')
+
+    def test_admin(self):
+        parse_admin = openbar.config.parse_admin
+        self.assertEqual(self.parse(parse_admin), {'admin_prefix': None})
+        self.assertEqual(self.parse(parse_admin, admin_prefix='/_openbar'),
+                         {'admin_prefix': '/_openbar'})
+        for prefix in ('/', '//', '_openbar', ''):
+            self.assertInvalid(parse_admin, admin_prefix=prefix)
+
+    def test_trace(self):
+        parse_trace = openbar.config.parse_trace
+        self.assertEqual(self.parse(parse_trace), {'trace_sample': 0.0, 'trace_export': None})
+        self.assertEqual(self.parse(parse_trace, trace_sample='0.01',
+                                    trace_export='udp:127.0.0.1:9411'),
+                         {'trace_sample': 0.01, 'trace_export': 'udp:127.0.0.1:9411'})
+        self.assertInvalid(parse_trace, trace_sample='often')
+        self.assertInvalid(parse_trace, trace_export='udp:collector')
+
+
+class ParseFileTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'openbar.conf')
+
+    def tearDown(self):
+        openbar.config._CONFIG.clear()
+        shutil.rmtree(self.tmpdir)
+
+    def parse(self, extra=''):
+        with open(self.path, 'w') as config:
+            config.write(_BACKEND + extra)
+        openbar.config.parse(self.path)
+        return openbar.config.get('backend')
+
+    def test_defaults(self):
+        backend = self.parse()
+        self.assertEqual(openbar.config.units(), ['backend'])
+        self.assertEqual(backend['port'], 7070)
+        self.assertEqual(backend['routing'], 'mount')
+        self.assertEqual(backend['max_timeout'], 300.0)
+        self.assertIsNone(backend['admin_prefix'])
+        self.assertEqual(backend['lazy'], {})
+
+    def test_max_timeout(self):
+        self.assertEqual(self.parse('max_timeout = 30\n')['max_timeout'], 30.0)
+        for value in ('0', '-1', '86401', 'nan'):
+            self.assertRaises(openbar.exceptions.InvalidConfiguration,
+                              self.parse, 'max_timeout = %s\n' % value)
+
+    def test_missing_key(self):
+        with open(self.path, 'w') as config:
+            config.write(_BACKEND.replace('pidfile', 'pid_file'))
+        self.assertRaises(openbar.exceptions.InvalidConfiguration,
+                          openbar.config.parse, self.path)
+
+    def test_empty(self):
+        self.assertRaises(openbar.exceptions.InvalidConfiguration,
+                          openbar.config.parse, self.path)
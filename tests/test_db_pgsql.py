@@ -0,0 +1,102 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+tests of the row formats of the PostgreSQL cursors
+"""
+
+import array
+import collections
+import unittest
+
+import openbar.db_pgsql
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+_Column = collections.namedtuple('_Column', ['name', 'type_code'])
+
+_INT8 = 20
+_FLOAT8 = 701
+_TEXT = 25
+
+
+class _Cursor(object):
+    """
+    result set served in chunks the way psycopg2 does, without a server
+    """
+    chunk = 2
+    _columns = openbar.db_pgsql._ColumnCursor._columns
+    _convert = openbar.db_pgsql._ColumnCursor._convert
+    fetchall = openbar.db_pgsql._ColumnCursor.fetchall
+    fetchmany = openbar.db_pgsql._ColumnCursor.fetchmany
+
+    def __init__(self, kind, description, rows):
+        self.kind = kind
+        self.description = description
+        self.rows = list(rows)
+        self.fetches = 0
+
+    def _fetch(self):
+        self.fetches += 1
+        rows, self.rows = self.rows[:self.chunk], self.rows[self.chunk:]
+        return rows
+
+_DESCRIPTION = [_Column('id', _INT8), _Column('score', _FLOAT8), _Column('name', _TEXT)]
+_ROWS = [(1, 0.5, 'a'), (2, 1.5, 'b'), (3, 2.5, 'c'), (4, 3.5, 'd'), (5, 4.5, 'e')]
+
+
+class ColumnCursorTest(unittest.TestCase):
+    def test_columns(self):
+        cursor = _Cursor('columns', _DESCRIPTION, _ROWS)
+        self.assertEqual(cursor.fetchall(), {'id': [1, 2, 3, 4, 5],
+                                             'score': [0.5, 1.5, 2.5, 3.5, 4.5],
+                                             'name': ['a', 'b', 'c', 'd', 'e']})
+        # chunk by chunk, up to the empty one ending the result set
+        self.assertEqual(cursor.fetches, 4)
+
+    def test_empty(self):
+        cursor = _Cursor('array', _DESCRIPTION, [])
+        self.assertEqual(cursor.fetchall(), {'id': array.array('q'),
+                                             'score': array.array('d'),
+                                             'name': []})
+
+    def test_no_result_set(self):
+        for kind in ('columns', 'array', 'numpy'):
+            cursor = _Cursor(kind, None, [])
+            self.assertEqual(cursor.fetchall(), {})
+            self.assertEqual(cursor.fetchmany(10), {})
+
+    def test_array(self):
+        columns = _Cursor('array', _DESCRIPTION, _ROWS).fetchall()
+        self.assertEqual(columns['id'], array.array('q', [1, 2, 3, 4, 5]))
+        self.assertEqual(columns['score'], array.array('d', [0.5, 1.5, 2.5, 3.5, 4.5]))
+        self.assertEqual(columns['name'], ['a', 'b', 'c', 'd', 'e'])
+
+    def test_array_nulls(self):
+        rows = [(1, None, 'a'), (None, 1.5, None)]
+        columns = _Cursor('array', _DESCRIPTION, rows).fetchall()
+        self.assertEqual(columns, {'id': [1, None], 'score': [None, 1.5], 'name': ['a', None]})
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy(self):
+        rows = [(1, 0.5, 'a'), (2, None, 'b')]
+        columns = _Cursor('numpy', _DESCRIPTION, rows).fetchall()
+        self.assertEqual(columns['id'].dtype, numpy.int64)
+        self.assertEqual(columns['id'].tolist(), [1, 2])
+        self.assertEqual(columns['name'].dtype, object)
+        self.assertEqual(columns['name'].tolist(), ['a', 'b'])
@@ -0,0 +1,99 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+tests of the per-request database statistics
+"""
+
+import unittest
+
+import openbar.dbstats
+
+
+class NormalizeTest(unittest.TestCase):
+    def test_literals(self):
+        normalize = openbar.dbstats.normalize
+        self.assertEqual(normalize("SELECT * FROM users WHERE id = 42"),
+                         "SELECT * FROM users WHERE id = ?")
+        self.assertEqual(normalize("SELECT * FROM users WHERE name = 'O''Brien' AND score > 1.5"),
+                         "SELECT * FROM users WHERE name = ? AND score > ?")
+        self.assertEqual(normalize("SELECT * FROM users WHERE id = %s AND name = %(name)s"),
+                         "SELECT * FROM users WHERE id = ? AND name = ?")
+        self.assertEqual(normalize(b"SELECT 1"), "SELECT ?")
+
+    def test_identifiers(self):
+        self.assertEqual(openbar.dbstats.normalize("SELECT col1 FROM t2"), "SELECT col1 FROM t2")
+
+    def test_lists(self):
+        normalize = openbar.dbstats.normalize
+        self.assertEqual(normalize("SELECT * FROM users WHERE id IN (1, 2, 3)"),
+                         normalize("SELECT * FROM users WHERE id in (%s)"))
+        self.assertEqual(normalize("SELECT * FROM users WHERE id IN (1, 2, 3)"),
+                         "SELECT * FROM users WHERE id IN (...)")
+
+    def test_comments_and_spaces(self):
+        self.assertEqual(openbar.dbstats.normalize("SELECT /* hint */ id\n  FROM users -- all\n"),
+                         "SELECT id FROM users")
+
+
+class StatsMiddlewareTest(unittest.TestCase):
+    def setUp(self):
+        self.queries = []
+        def app(environ, start_response):
+            for sql, elapsed in self.queries:
+                openbar.dbstats.query(sql, elapsed)
+            openbar.dbstats.wait(0.25)
+            start_response('200 OK', [])
+            return [b'ok']
+        self.app = openbar.dbstats.StatsMiddleware(app)
+        openbar.dbstats.configure(0, 1.0, 3)
+
+    def tearDown(self):
+        openbar.dbstats.configure(0.5, 1.0, 10)
+
+    def call(self, environ=None):
+        environ = environ if environ is not None else {}
+        self.app(environ, lambda status, headers, exc_info=None: None)
+        return environ
+
+    def test_fields(self):
+        self.queries = [("SELECT 1", 0.5), ("SELECT 2", 0.25)]
+        fields = self.call()['openbar.log']
+        self.assertEqual(fields, {'db_queries': 2, 'db_time': '0.750', 'db_wait': '0.250'})
+
+    def test_no_queries(self):
+        self.assertNotIn('openbar.log', self.call())
+
+    def test_n_plus_one(self):
+        self.queries = [("SELECT * FROM items WHERE id = %i" % i, 0.001) for i in range(4)]
+        self.assertEqual(self.call()['openbar.log']['n_plus_one'], 4)
+        self.queries = self.queries[:3]
+        self.assertNotIn('n_plus_one', self.call()['openbar.log'])
+        openbar.dbstats.configure(0, 1.0, 0)
+        self.queries = [("SELECT 1", 0.001)] * 20
+        self.assertNotIn('n_plus_one', self.call()['openbar.log'])
+
+    def test_batch(self):
+        # sub-requests account for the batch, which alone reports
+        self.queries = [("SELECT 1", 0.125)]
+        environ = self.call()
+        sub = self.call({'openbar.dbstats': environ['openbar.dbstats']})
+        self.assertNotIn('openbar.log', sub)
+        self.assertEqual(environ['openbar.dbstats'].queries, 2)
+
+    def test_outside_request(self):
+        openbar.dbstats.query("SELECT 1", 0.1)
+        openbar.dbstats.wait(0.1)
+        self.assertNotIn('openbar.log', self.call())
@@ -0,0 +1,104 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+tests of per-request deadlines
+"""
+
+import unittest
+
+import openbar.deadline
+import openbar.exceptions
+import openbar.routes
+
+from tests import request
+
+
+class ParseTest(unittest.TestCase):
+    def tearDown(self):
+        openbar.deadline.configure(300.0)
+
+    def test_valid(self):
+        self.assertEqual(openbar.deadline.parse('2.5'), 2.5)
+        self.assertEqual(openbar.deadline.parse(' 10 '), 10.0)
+        self.assertEqual(openbar.deadline.parse('1e-3'), 0.001)
+
+    def test_invalid(self):
+        for value in (None, '', 'soon', '0', '-1', 'nan', 'inf', '-inf', '1,5'):
+            self.assertIsNone(openbar.deadline.parse(value), value)
+
+    def test_clamp(self):
+        self.assertEqual(openbar.deadline.parse('1e9'), 300.0)
+        openbar.deadline.configure(5.0)
+        self.assertEqual(openbar.deadline.parse('30'), 5.0)
+        self.assertEqual(openbar.deadline.parse('3'), 3.0)
+
+
+class DeadlineMiddlewareTest(unittest.TestCase):
+    def setUp(self):
+        self.remaining = []
+        self.fail = False
+        def app(environ, start_response):
+            self.remaining.append(openbar.deadline.remaining())
+            if self.fail:
+                try:
+                    openbar.deadline.check()
+                except openbar.exceptions.DeadlineExceeded:
+                    start_response('500 Internal Server Error', [])
+                    return [b'error']
+            start_response('200 OK', [])
+            return [b'ok']
+        self.app = openbar.deadline.DeadlineMiddleware(app)
+        openbar.routes.register('9.0', 'timed', timeout=2.0)(lambda app: None)
+
+    def tearDown(self):
+        openbar.routes._ROUTES.pop(('9.0', 'timed'), None)
+        openbar.deadline.configure(300.0)
+
+    def test_no_deadline(self):
+        self.assertEqual(request(self.app, 'GET', '/9.0/other/')[0], 200)
+        self.assertEqual(self.remaining, [None])
+        self.assertIsNone(openbar.deadline.remaining())
+
+    def test_header(self):
+        request(self.app, 'GET', '/', headers={'X-Openbar-Timeout': '1.5'})
+        self.assertTrue(1.0 < self.remaining[0] <= 1.5)
+        self.assertIsNone(openbar.deadline.remaining())
+
+    def test_invalid_header(self):
+        for value in ('soon', '-1', 'nan', 'inf'):
+            request(self.app, 'GET', '/', headers={'X-Openbar-Timeout': value})
+        self.assertEqual(self.remaining, [None] * 4)
+
+    def test_clamped_header(self):
+        openbar.deadline.configure(10.0)
+        request(self.app, 'GET', '/', headers={'X-Openbar-Timeout': '1e12'})
+        self.assertTrue(9.0 < self.remaining[0] <= 10.0)
+
+    def test_mount_timeout(self):
+        request(self.app, 'GET', '/9.0/timed/items')
+        request(self.app, 'GET', '/9.0/timed/items', headers={'X-Openbar-Timeout': '60'})
+        request(self.app, 'GET', '/9.0/timed/items', headers={'X-Openbar-Timeout': '0.5'})
+        self.assertTrue(1.5 < self.remaining[0] <= 2.0)
+        self.assertTrue(1.5 < self.remaining[1] <= 2.0)
+        self.assertTrue(self.remaining[2] <= 0.5)
+
+    def test_missed(self):
+        self.fail = True
+        status, _, body = request(self.app, 'GET', '/',
+                                  headers={'X-Openbar-Timeout': '1e-9'})
+        self.assertEqual(status, 504)
+        self.assertEqual(body, openbar.deadline._TIMEOUT)
+        self.assertFalse(openbar.deadline.missed())
@@ -0,0 +1,113 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+tests of the listening sockets
+"""
+
+import os
+import shutil
+import socket
+import stat
+import tempfile
+import unittest
+import unittest.mock
+
+import openbar.listen
+
+
+class ParseTest(unittest.TestCase):
+    def test_valid(self):
+        parse = openbar.listen.parse
+        self.assertEqual(parse('unix:/run/openbar.sock'), ('unix', '/run/openbar.sock'))
+        self.assertEqual(parse('fd:3'), ('fd', 3))
+        self.assertEqual(parse('systemd'), ('systemd', None))
+
+    def test_invalid(self):
+        for listen in ('unix:', 'fd:', 'fd:-1', 'fd:three', 'tcp:7070', 'Systemd', ''):
+            self.assertRaises(ValueError, openbar.listen.parse, listen)
+
+
+class ListenerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'unit.sock')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_unix(self):
+        sock = openbar.listen.listener('unix:' + self.path, uid=os.getuid(),
+                                       gid=os.getgid(), mode=0o600)
+        try:
+            st = os.stat(self.path)
+            self.assertTrue(stat.S_ISSOCK(st.st_mode))
+            self.assertEqual(stat.S_IMODE(st.st_mode), 0o600)
+            self.assertEqual((st.st_uid, st.st_gid), (os.getuid(), os.getgid()))
+            self.assertEqual(openbar.listen.describe(sock), 'unix:' + self.path)
+            self.assertTrue(sock.get_inheritable())
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            client.connect(self.path)
+            client.close()
+        finally:
+            sock.close()
+
+    def test_unix_default_mode(self):
+        sock = openbar.listen._bind_unix(self.path)
+        try:
+            self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o660)
+        finally:
+            sock.close()
+
+    def test_unix_stale(self):
+        # a socket left by a previous run is replaced, other files are not
+        openbar.listen._bind_unix(self.path).close()
+        openbar.listen._bind_unix(self.path).close()
+        other = os.path.join(self.tmpdir, 'file')
+        with open(other, 'w'):
+            pass
+        self.assertRaises(OSError, openbar.listen._bind_unix, other)
+        self.assertTrue(os.path.isfile(other))
+
+    def test_inet(self):
+        sock = openbar.listen.listener(host='127.0.0.1', port=0)
+        try:
+            self.assertTrue(openbar.listen.describe(sock).startswith('127.0.0.1:'))
+        finally:
+            sock.close()
+
+    def test_inherit(self):
+        bound = openbar.listen._bind_inet('127.0.0.1', 0)
+        fd = os.dup(bound.fileno())
+        bound.close()
+        sock = openbar.listen.listener('fd:%i' % fd)
+        try:
+            self.assertEqual(sock.fileno(), fd)
+            self.assertEqual(sock.type, socket.SOCK_STREAM)
+        finally:
+            sock.close()
+        datagram = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            fd = os.dup(datagram.fileno())
+            self.assertRaises(OSError, openbar.listen._inherit, fd)
+        finally:
+            datagram.close()
+
+    def test_activated(self):
+        environ = {'LISTEN_PID': str(os.getpid() + 1), 'LISTEN_FDS': '1'}
+        with unittest.mock.patch.dict(os.environ, environ):
+            self.assertRaises(OSError, openbar.listen._activated)
+        with unittest.mock.patch.dict(os.environ, {'LISTEN_PID': 'x', 'LISTEN_FDS': '1'}):
+            self.assertRaises(OSError, openbar.listen._activated)
@@ -0,0 +1,144 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+tests of worker recycling and of the allocations sampled per route
+"""
+
+import collections
+import os
+import tracemalloc
+import unittest
+
+import openbar.memtrack
+import openbar.run
+
+_Route = collections.namedtuple('_Route', ['method', 'rule', 'app'])
+
+
+class ServedTest(unittest.TestCase):
+    def setUp(self):
+        self.rfd, self.wfd = os.pipe()
+        os.set_blocking(self.rfd, False)
+
+    def tearDown(self):
+        os.close(self.rfd)
+        os.close(self.wfd)
+
+    def daemon(self, **kwargs):
+        daemon = openbar.run.daemon('openbar-tests', **kwargs)
+        # as in a worker, which only keeps the write end of the pipe
+        daemon.recycle = (None, self.wfd)
+        return daemon
+
+    def requested(self):
+        try:
+            return os.read(self.rfd, 512)
+        except BlockingIOError:
+            return b''
+
+    def test_max_requests(self):
+        daemon = self.daemon(max_requests=3)
+        daemon.served()
+        daemon.served()
+        self.assertEqual(self.requested(), b'')
+        daemon.served()
+        self.assertEqual(self.requested(), b'%i\n' % os.getpid())
+        # a worker asks for its replacement once
+        daemon.served()
+        self.assertEqual(self.requested(), b'')
+
+    def test_max_rss(self):
+        daemon = self.daemon(max_rss=1)
+        daemon.served()
+        self.assertEqual(self.requested(), b'%i\n' % os.getpid())
+
+        daemon = self.daemon(max_rss=1024 * 1024)
+        daemon.served()
+        self.assertEqual(self.requested(), b'')
+        # resident memory is read at most once a second
+        daemon.max_rss = 1
+        daemon.served()
+        self.assertEqual(self.requested(), b'')
+
+    def test_disabled(self):
+        daemon = self.daemon()
+        for _ in range(100):
+            daemon.served()
+        self.assertEqual(self.requested(), b'')
+        # the master never recycles itself
+        master = openbar.run.daemon('openbar-tests', max_requests=1)
+        master.recycle = (self.rfd, self.wfd)
+        master.served()
+        self.assertEqual(self.requested(), b'')
+
+
+class MemoryMiddlewareTest(unittest.TestCase):
+    def setUp(self):
+        self.root = object()
+        self.mount = object()
+        self.route = None
+        def app(environ, start_response):
+            environ['bottle.route'] = self.route
+            self.allocated = [bytearray(1024) for _ in range(100)]
+            start_response('200 OK', [])
+            return [b'ok']
+        self.app = openbar.memtrack.MemoryMiddleware(app, self.root)
+
+    def tearDown(self):
+        openbar.memtrack.configure(0.0)
+        openbar.memtrack._ROUTES.clear()
+
+    def key(self, route, path):
+        return self.app._route({'bottle.route': route}, path)
+
+    def test_route(self):
+        self.assertIsNone(self.key(None, '/'))
+        self.assertEqual(self.key(_Route('GET', '/health', self.root), '/health'),
+                         'GET /health')
+        # rules of a mount are relative to its prefix, unless bottle merged
+        # them into the root
+        self.assertEqual(self.key(_Route('GET', '/<item:int>', self.mount), '/1.0/items/42'),
+                         'GET /1.0/items/<item:int>')
+        self.assertEqual(self.key(_Route('POST', '/1.0/items/<item:int>', self.mount),
+                                  '/1.0/items/42'),
+                         'POST /1.0/items/<item:int>')
+
+    def call(self, path):
+        environ = {'PATH_INFO': path}
+        return self.app(environ, lambda status, headers, exc_info=None: None)
+
+    def test_sampled(self):
+        self.route = _Route('GET', '/<item:int>', self.mount)
+        self.assertEqual(self.call('/1.0/items/1'), [b'ok'])
+        self.assertEqual(openbar.memtrack._ROUTES, {})
+
+        openbar.memtrack.configure(1.0)
+        self.assertTrue(openbar.memtrack.enabled())
+        self.assertFalse(tracemalloc.is_tracing())
+        def app(environ, start_response):
+            self.assertTrue(tracemalloc.is_tracing())
+            return inner(environ, start_response)
+        inner, self.app.app = self.app.app, app
+        self.call('/1.0/items/1')
+        # tracing is only enabled around a sampled request
+        self.assertFalse(tracemalloc.is_tracing())
+        self.call('/1.0/items/2')
+        stats = openbar.memtrack.stats()
+        self.assertEqual(stats['sample'], 1.0)
+        route, = stats['routes']
+        self.assertEqual((route['route'], route['samples']), ('GET /1.0/items/<item:int>', 2))
+        self.assertGreaterEqual(route['allocated_avg'], 100 * 1024)
+        self.assertGreaterEqual(route['peak'], 100 * 1024)
@@ -0,0 +1,124 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+tests of the routers
+"""
+
+import json as pyjson
+import sys
+import unittest
+
+import bottle
+
+import openbar.routes
+
+from tests import request
+
+_LAZY_MODULE = 'tests.lazy_mount'
+
+
+def _items(app):
+    @app.get('/<item:int>')
+    def _get(item):
+        return {'id': item, 'version': '9.0', 'path': bottle.request.fullpath}
+
+def _items_override(app):
+    @app.get('/latest')
+    def _latest():
+        return {'version': '9.1'}
+
+def _hooks(app):
+    @app.hook('before_request')
+    def _before():
+        bottle.request.environ['tests.hook'] = True
+
+    @app.error(404)
+    def _not_found(error):
+        return 'no such item'
+
+    @app.get('/')
+    def _index():
+        return {'hook': bottle.request.environ.get('tests.hook', False)}
+
+
+class RoutesTest(unittest.TestCase):
+    flat = False
+
+    def setUp(self):
+        openbar.routes.register('9.0', 'items')(_items)
+        openbar.routes.register('9.1', 'items', override='9.0')(_items_override)
+        openbar.routes.register('9.0', 'hooks')(_hooks)
+        openbar.routes.register_lazy('9.0', 'lazy', _LAZY_MODULE)
+        sys.modules.pop(_LAZY_MODULE, None)
+
+        self.root = bottle.Bottle()
+        @self.root.get('/health')
+        def _health():
+            return {'ok': True}
+        self.app = openbar.routes.install_routes(self.root, flat=self.flat)
+
+    def tearDown(self):
+        for key in [('9.0', 'items'), ('9.1', 'items'), ('9.0', 'hooks'), ('9.0', 'lazy')]:
+            openbar.routes._ROUTES.pop(key, None)
+            openbar.routes._LAZY.pop(key, None)
+        sys.modules.pop(_LAZY_MODULE, None)
+
+    def get(self, path):
+        status, _, body = request(self.app, 'GET', path)
+        if status != 200:
+            return status, body
+        return status, pyjson.loads(body)
+
+    def test_root(self):
+        self.assertEqual(self.get('/health'), (200, {'ok': True}))
+        self.assertEqual(self.get('/nowhere')[0], 404)
+        self.assertEqual(self.get('/8.0/items/1')[0], 404)
+
+    def test_mounts(self):
+        status, item = self.get('/9.0/items/42')
+        self.assertEqual(status, 200)
+        self.assertEqual(item['id'], 42)
+        self.assertEqual(item['path'], '/9.0/items/42')
+
+    def test_override(self):
+        self.assertEqual(self.get('/9.1/items/42')[1]['id'], 42)
+        self.assertEqual(self.get('/9.1/items/latest'), (200, {'version': '9.1'}))
+        self.assertEqual(self.get('/9.0/items/latest')[0], 404)
+
+    def test_lazy(self):
+        self.assertNotIn(_LAZY_MODULE, sys.modules)
+        self.assertEqual(self.get('/9.0/lazy/7'), (200, {'id': 7, 'path': '/9.0/lazy/7'}))
+        self.assertIn(_LAZY_MODULE, sys.modules)
+        self.assertEqual(self.get('/9.0/lazy/8')[1]['id'], 8)
+
+class FlatRoutesTest(RoutesTest):
+    flat = True
+
+    def test_dispatcher(self):
+        self.assertIsInstance(self.app, openbar.routes._PrefixDispatcher)
+        self.assertEqual(sorted(self.app.apps),
+                         [('9.0', 'hooks'), ('9.0', 'items'), ('9.0', 'lazy'), ('9.1', 'items')])
+
+    def test_hooks(self):
+        self.assertEqual(self.get('/9.0/hooks/'), (200, {'hook': True}))
+        self.assertEqual(self.get('/9.0/hooks/missing'), (404, b'no such item'))
+
+    def test_environ_restored(self):
+        # bottle's mount leaves the environ shifted, the dispatcher does not
+        environ = {'REQUEST_METHOD': 'GET', 'SCRIPT_NAME': '', 'PATH_INFO': '/9.0/items/1',
+                   'wsgi.input': None}
+        self.app(environ, lambda status, headers, exc_info=None: None)
+        self.assertEqual((environ['SCRIPT_NAME'], environ['PATH_INFO']), ('', '/9.0/items/1'))
@@ -0,0 +1,166 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+tests of the liveness checks and stop of the controller
+"""
+
+import fcntl
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import unittest.mock
+
+import openbar.run
+import openbar.sampler
+
+_SLEEP = 'import time; time.sleep(30)'
+# a master killing a worker that does not drain
+_DRAINING = ('import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); '
+             'print(flush=True); time.sleep(0.6)')
+
+
+class StatusTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.pidfile = os.path.join(self.tmpdir, 'unit.pid')
+        self.daemon = openbar.run.daemon('openbar-unit', pidfile=self.pidfile)
+        self.children = []
+
+    def tearDown(self):
+        for child in self.children:
+            child.kill()
+            child.wait()
+        shutil.rmtree(self.tmpdir)
+
+    def spawn(self, *argv):
+        child = subprocess.Popen([sys.executable, '-c', _SLEEP] + list(argv))
+        self.children.append(child)
+        # the command line is only replaced once the child has exec'd
+        cmdline = '/proc/%i/cmdline' % child.pid
+        timer0 = time.monotonic()
+        while os.path.exists(cmdline) and time.monotonic() - timer0 < 5:
+            with open(cmdline, 'rb') as proc:
+                if _SLEEP.encode('utf-8') in proc.read():
+                    break
+            time.sleep(0.01)
+        return child.pid
+
+    def write_pid(self, pid):
+        with open(self.pidfile, 'w') as pidfile:
+            pidfile.write('%i\n' % pid)
+
+    def test_no_pidfile(self):
+        self.assertIsNone(self.daemon._is_locked())
+        self.assertFalse(self.daemon.status())
+
+    def test_locked(self):
+        # the pid is not checked while the unit holds the lock
+        self.write_pid(2 ** 22 + 1)
+        fd = os.open(self.pidfile, os.O_RDONLY)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            self.assertTrue(self.daemon._is_locked())
+            self.assertTrue(self.daemon.status())
+        finally:
+            os.close(fd)
+        self.assertFalse(self.daemon._is_locked())
+
+    def test_unlocked_running(self):
+        # units started before the pidfile was locked
+        self.write_pid(self.spawn('unit:'))
+        self.assertFalse(self.daemon._is_locked())
+        self.assertTrue(self.daemon.status())
+
+    def test_stale(self):
+        child = subprocess.Popen([sys.executable, '-c', 'pass'])
+        child.wait()
+        self.write_pid(child.pid)
+        self.assertFalse(self.daemon.status())
+
+    @unittest.skipUnless(os.path.isdir('/proc/self'), 'no /proc')
+    def test_pid_reused(self):
+        self.write_pid(self.spawn('other:'))
+        self.assertFalse(self.daemon.status())
+
+    def test_stop_waits_for_kill(self):
+        # the controller outwaits the master killing workers past the drain
+        child = subprocess.Popen([sys.executable, '-c', _DRAINING, 'unit:'],
+                                 stdout=subprocess.PIPE)
+        self.children.append(child)
+        child.stdout.readline()
+        threading.Thread(target=child.wait, daemon=True).start()
+        self.write_pid(child.pid)
+        self.daemon.drain_timeout = 0
+        with unittest.mock.patch.object(openbar.run, 'KILL_GRACE', 0.5):
+            self.daemon.stop()
+        self.assertIsNotNone(child.poll())
+
+
+_CONFIG = """
+[backend]
+type = backend
+user = _openbar
+secret = secret
+frontend = http://127.0.0.1:7071
+packages = myproject
+pidfile = %s
+host = 127.0.0.1
+port = 7070
+"""
+
+
+class ProfileTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.pidfile = os.path.join(self.tmpdir, 'unit.pid')
+        self.daemon = openbar.run.daemon('openbar-unit', pidfile=self.pidfile)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def profile(self, request):
+        with open(self.daemon._profile_request(), 'w') as output:
+            output.write(request)
+        with unittest.mock.patch.object(openbar.sampler, 'start') as start:
+            self.daemon._profile(None, None)
+        return start.call_args[0][0]
+
+    def test_request(self):
+        self.assertEqual(self.profile('30\n'), 30.0)
+        for request in ('-5', '0', '7200', 'nan', 'soon'):
+            self.assertEqual(self.profile(request), openbar.run.PROFILE_SECONDS, request)
+
+    @unittest.skipUnless(os.geteuid() == 0, 'openbarctl runs as root')
+    def test_controller(self):
+        config = os.path.join(self.tmpdir, 'openbar.conf')
+        with open(config, 'w') as output:
+            output.write(_CONFIG % self.pidfile)
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        script = os.path.join(root, 'scripts', 'openbarctl')
+        env = dict(os.environ, PYTHONPATH=root)
+        for seconds in ('-5', '0', '7200', 'nan', 'soon'):
+            result = subprocess.run([sys.executable, script, '-f', config,
+                                     'profile', 'backend', seconds],
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                    env=env, timeout=10)
+            self.assertEqual(result.returncode, 1, seconds)
+            self.assertIn(b'usage:', result.stdout)
+            self.assertNotIn(b'Traceback', result.stderr)
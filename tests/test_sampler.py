@@ -0,0 +1,83 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+tests of the stack sampling profiler
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import openbar.sampler
+
+
+def _busy_sampled_function(stop):
+    while not stop.is_set():
+        time.sleep(0.001)
+
+
+class SamplerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'profile.folded')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def wait(self):
+        timer0 = time.monotonic()
+        while openbar.sampler._SAMPLER is not None and time.monotonic() - timer0 < 5:
+            time.sleep(0.01)
+        self.assertIsNone(openbar.sampler._SAMPLER)
+
+    def test_collapsed_stacks(self):
+        stop = threading.Event()
+        thread = threading.Thread(target=_busy_sampled_function, args=(stop, ))
+        thread.start()
+        try:
+            self.assertTrue(openbar.sampler.start(0.2, self.path, 0.01))
+            self.assertFalse(openbar.sampler.start(0.2, self.path + '.other', 0.01))
+            self.wait()
+        finally:
+            stop.set()
+            thread.join()
+
+        self.assertFalse(os.path.exists(self.path + '.tmp'))
+        self.assertFalse(os.path.exists(self.path + '.other'))
+        with open(self.path) as profile:
+            lines = profile.read().splitlines()
+        counts = []
+        for line in lines:
+            stack, _, count = line.rpartition(' ')
+            counts.append(int(count))
+            frames = stack.split(';')
+            self.assertTrue(all(frame.endswith(')') and ' (' in frame for frame in frames), line)
+        # most sampled stacks first
+        self.assertEqual(counts, sorted(counts, reverse=True))
+        busy = [line for line in lines if '_busy_sampled_function (%s:' % __file__ in line]
+        self.assertTrue(busy)
+        # outermost frame first
+        self.assertTrue(busy[0].split(';')[0].startswith('_bootstrap '))
+
+    def test_failure(self):
+        self.assertTrue(openbar.sampler.start(0.01, os.path.join(self.tmpdir, 'missing', 'out')))
+        self.wait()
+        self.assertTrue(openbar.sampler.start(0.01, self.path))
+        self.wait()
+        self.assertTrue(os.path.exists(self.path))
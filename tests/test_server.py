@@ -0,0 +1,128 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+smoke tests of the wsgi server, on the interpreters CherryPy 3.3 runs on
+"""
+
+import http.client
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+import traceback
+import unittest
+
+import openbar.client
+import openbar.listen
+
+try:
+    import openbar.server
+except ImportError:
+    # CherryPy 3.3 does not import on Python 3.8 and later
+    server = None
+else:
+    server = openbar.server
+
+
+def _app(environ, start_response):
+    body = environ['PATH_INFO'].encode('utf-8')
+    start_response('200 OK', [('Content-Type', 'text/plain'),
+                              ('Content-Length', str(len(body)))])
+    return [body]
+
+
+@unittest.skipIf(server is None, 'CherryPy does not import on this interpreter')
+class ServeTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def serve(self, listener):
+        # a worker serving the listener of its master until SIGTERM
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                def _stop(signum, frame):
+                    sys.exit(0)
+                signal.signal(signal.SIGTERM, _stop)
+                server.serve(_app, listener, numthreads=2, shutdown_timeout=1)
+            except SystemExit as exc:
+                status = exc.code
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                os._exit(status)
+        return pid
+
+    def stop(self, pid):
+        timer0 = time.monotonic()
+        os.kill(pid, signal.SIGTERM)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.WEXITSTATUS(status), 0)
+        self.assertLess(time.monotonic() - timer0, 5)
+
+    def check_listener(self, listener, connect):
+        # nothing was left in the queue of the listener by the worker
+        listener.settimeout(0.5)
+        self.assertRaises(socket.timeout, listener.accept)
+        # and it still accepts connections for the next worker
+        client = connect()
+        try:
+            conn, _ = listener.accept()
+            conn.close()
+        finally:
+            client.close()
+
+    def test_tcp(self):
+        listener = openbar.listen.listener(host='127.0.0.1', port=0)
+        port = listener.getsockname()[1]
+        try:
+            pid = self.serve(listener)
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            conn.request('GET', '/1.0/items/1')
+            response = conn.getresponse()
+            self.assertEqual((response.status, response.read()), (200, b'/1.0/items/1'))
+            conn.close()
+            self.stop(pid)
+            self.check_listener(listener,
+                                lambda: socket.create_connection(('127.0.0.1', port)))
+        finally:
+            listener.close()
+
+    def test_unix(self):
+        path = os.path.join(self.tmpdir, 'unit.sock')
+        listener = openbar.listen.listener('unix:' + path)
+        try:
+            pid = self.serve(listener)
+            conn = openbar.client._UnixHTTPConnection(path)
+            conn.request('GET', '/health')
+            response = conn.getresponse()
+            self.assertEqual((response.status, response.read()), (200, b'/health'))
+            conn.close()
+            self.stop(pid)
+            def connect():
+                client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                client.connect(path)
+                return client
+            self.check_listener(listener, connect)
+        finally:
+            listener.close()
@@ -0,0 +1,149 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+tests of the background tasks
+"""
+
+import threading
+import time
+import unittest
+
+import openbar.tasks
+
+
+class ExecutorTest(unittest.TestCase):
+    def setUp(self):
+        self.executor = openbar.tasks._Executor(2, 10, 1)
+
+    def tearDown(self):
+        self.executor.drain(1.0)
+
+    def submit(self, func, *args, retries=0, backoff=0.01, db=False):
+        task = openbar.tasks._Task(func, args, {}, retries, backoff, db)
+        return self.executor.submit(task)
+
+    def wait(self, count):
+        with self.executor.cond:
+            self.executor.cond.wait_for(
+                lambda: sum(self.executor.counters[key]
+                            for key in ('completed', 'failed')) >= count, 5.0)
+
+    def test_run(self):
+        done = []
+        self.assertTrue(self.submit(done.append, 1))
+        self.assertTrue(self.submit(done.append, 2))
+        self.wait(2)
+        self.assertEqual(sorted(done), [1, 2])
+        self.assertEqual(self.executor.stats()['completed'], 2)
+
+    def test_retries(self):
+        attempts = []
+        def flaky():
+            attempts.append(True)
+            if len(attempts) < 3:
+                raise RuntimeError('flaky')
+        def broken():
+            raise RuntimeError('broken')
+        self.submit(flaky, retries=3)
+        self.submit(broken, retries=1)
+        self.wait(2)
+        stats = self.executor.stats()
+        self.assertEqual(len(attempts), 3)
+        self.assertEqual((stats['completed'], stats['failed'], stats['retried']), (1, 1, 3))
+
+    def test_queue_full(self):
+        release = threading.Event()
+        for _ in range(2):
+            self.submit(release.wait)
+        while self.executor.stats()['running'] < 2:
+            time.sleep(0.01)
+        for _ in range(10):
+            self.assertTrue(self.submit(lambda: None))
+        self.assertFalse(self.submit(lambda: None))
+        self.assertEqual(self.executor.stats()['rejected'], 1)
+        release.set()
+
+    def test_db(self):
+        seen = []
+        self.submit(lambda: seen.append(openbar.tasks.in_db_task()), db=True)
+        self.submit(lambda: seen.append(openbar.tasks.in_db_task()))
+        self.wait(2)
+        self.assertEqual(sorted(seen), [False, True])
+        self.assertFalse(openbar.tasks.in_db_task())
+
+    def test_drain(self):
+        release = threading.Event()
+        for _ in range(2):
+            self.submit(release.wait)
+        for _ in range(3):
+            self.submit(lambda: None)
+        threading.Timer(0.05, release.set).start()
+        self.assertEqual(self.executor.drain(1.0), 0)
+        self.assertEqual(self.executor.stats()['completed'], 5)
+        self.assertFalse(self.submit(lambda: None))
+
+    def test_drain_timeout(self):
+        release = threading.Event()
+        for _ in range(2):
+            self.submit(release.wait)
+        self.submit(lambda: None)
+        self.assertEqual(self.executor.drain(0.05), 1)
+        self.assertEqual(self.executor.stats()['dropped'], 1)
+        release.set()
+
+
+class AfterResponseTest(unittest.TestCase):
+    def setUp(self):
+        openbar.tasks._EXECUTOR = openbar.tasks._Executor(1, 10, 1)
+        self.done = []
+        self.app = openbar.tasks.TasksMiddleware(self._app)
+
+    def tearDown(self):
+        openbar.tasks.drain(1.0)
+        openbar.tasks._EXECUTOR = None
+
+    def _app(self, environ, start_response):
+        openbar.tasks.after_response(self.done.append, environ['PATH_INFO'])
+        start_response('200 OK', [])
+        return [b'ok']
+
+    def call(self, path, environ=None):
+        environ = dict(environ or {}, PATH_INFO=path)
+        return environ, self.app(environ, lambda status, headers, exc_info=None: None)
+
+    def test_after_response(self):
+        _, body = self.call('/request')
+        self.assertEqual(list(body), [b'ok'])
+        self.assertEqual(openbar.tasks.stats()['submitted'], 0)
+        body.close()
+        self.assertEqual(openbar.tasks.drain(1.0), 0)
+        self.assertEqual(self.done, ['/request'])
+
+    def test_outside_request(self):
+        openbar.tasks.after_response(self.done.append, 'now')
+        openbar.tasks.drain(1.0)
+        self.assertEqual(self.done, ['now'])
+
+    def test_batch(self):
+        # sub-requests of a batch share its tasks through the environ
+        environ, body = self.call('/batch')
+        _, sub = self.call('/sub', {'openbar.tasks': environ['openbar.tasks']})
+        self.assertEqual(sub, [b'ok'])
+        self.assertEqual(len(environ['openbar.tasks']), 2)
+        self.assertEqual(openbar.tasks.stats()['submitted'], 0)
+        body.close()
+        openbar.tasks.drain(1.0)
+        self.assertEqual(self.done, ['/batch', '/sub'])
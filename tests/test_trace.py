@@ -0,0 +1,167 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+tests of request tracing
+"""
+
+import json as pyjson
+import os
+import shutil
+import tempfile
+import unittest
+
+import openbar.trace
+
+_TRACE_ID = '4bf92f3577b34da6a3ce929d0e0e4736'
+_PARENT_ID = '00f067aa0ba902b7'
+
+
+class ParseTest(unittest.TestCase):
+    def test_valid(self):
+        parse = openbar.trace._parse
+        self.assertEqual(parse('00-%s-%s-01' % (_TRACE_ID, _PARENT_ID)),
+                         (_TRACE_ID, _PARENT_ID, True))
+        self.assertEqual(parse(' 00-%s-%s-00 ' % (_TRACE_ID, _PARENT_ID)),
+                         (_TRACE_ID, _PARENT_ID, False))
+        # later versions may append fields
+        self.assertEqual(parse('01-%s-%s-03-extra' % (_TRACE_ID, _PARENT_ID)),
+                         (_TRACE_ID, _PARENT_ID, True))
+
+    def test_invalid(self):
+        for header in ('', 'garbage', '00-%s-%s' % (_TRACE_ID, _PARENT_ID),
+                       '00-%s-%s-01' % (_TRACE_ID[:-1], _PARENT_ID),
+                       '00-%s-%s-01' % (_TRACE_ID, _PARENT_ID + '0'),
+                       '00-%s-%s-01' % ('z' * 32, _PARENT_ID),
+                       '00-%s-%s-zz' % (_TRACE_ID, _PARENT_ID),
+                       '00-%s-%s-01' % ('0' * 32, _PARENT_ID),
+                       '00-%s-%s-01' % (_TRACE_ID, '0' * 16)):
+            self.assertIsNone(openbar.trace._parse(header), header)
+
+    def test_export(self):
+        self.assertIsNone(openbar.trace.parse_export(None))
+        self.assertEqual(openbar.trace.parse_export('/var/log/traces.json'),
+                         ('file', '/var/log/traces.json'))
+        self.assertEqual(openbar.trace.parse_export('udp:127.0.0.1:9411'),
+                         ('udp', ('127.0.0.1', 9411)))
+        self.assertEqual(openbar.trace.parse_export('udp:[::1]:9411'),
+                         ('udp', ('::1', 9411)))
+        for value in ('udp:', 'udp:host', 'udp:host:port', 'udp::9411'):
+            self.assertRaises(ValueError, openbar.trace.parse_export, value)
+
+
+class TraceTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.export = os.path.join(self.tmpdir, 'traces.json')
+
+    def tearDown(self):
+        openbar.trace.configure(0.0, None)
+        shutil.rmtree(self.tmpdir)
+
+    def spans(self):
+        openbar.trace.flush()
+        if not os.path.exists(self.export):
+            return []
+        with open(self.export) as traces:
+            return [span for line in traces for span in pyjson.loads(line)]
+
+    def test_new_trace(self):
+        environ = {'openbar.log': {}}
+        context = openbar.trace.begin(environ)
+        try:
+            trace_id = openbar.trace.trace_id()
+            self.assertEqual(len(trace_id), 32)
+            self.assertEqual(environ['openbar.log']['trace'], trace_id)
+            header = openbar.trace.header()
+            self.assertEqual(openbar.trace._parse(header)[0::2], (trace_id, False))
+            self.assertFalse(openbar.trace.recording())
+            self.assertIs(openbar.trace.span('unsampled'), openbar.trace.NOSPAN)
+        finally:
+            openbar.trace.end(context)
+        self.assertIsNone(openbar.trace.trace_id())
+        self.assertIsNone(openbar.trace.header())
+
+    def test_continue_trace(self):
+        environ = {'HTTP_TRACEPARENT': '00-%s-%s-00' % (_TRACE_ID, _PARENT_ID)}
+        context = openbar.trace.begin(environ)
+        try:
+            self.assertEqual(openbar.trace.trace_id(), _TRACE_ID)
+            # calls are made from a span of this unit, not from the caller's
+            header = openbar.trace._parse(openbar.trace.header())
+            self.assertEqual(header[0], _TRACE_ID)
+            self.assertNotEqual(header[1], _PARENT_ID)
+        finally:
+            openbar.trace.end(context)
+
+    def test_nested(self):
+        outer = openbar.trace.begin({})
+        inner = openbar.trace.begin({'HTTP_TRACEPARENT': '00-%s-%s-00' % (_TRACE_ID, _PARENT_ID)})
+        self.assertEqual(openbar.trace.trace_id(), _TRACE_ID)
+        openbar.trace.end(inner)
+        self.assertEqual(openbar.trace.trace_id(), outer.trace_id)
+        openbar.trace.end(outer)
+
+    def test_sampled(self):
+        openbar.trace.configure(1.0, self.export, 'tests')
+        context = openbar.trace.begin({'REQUEST_METHOD': 'GET', 'PATH_INFO': '/1.0/items/'})
+        try:
+            self.assertTrue(openbar.trace.recording())
+            with openbar.trace.span('work', 'CLIENT', size=3) as span:
+                span.tag('rows', 42)
+            self.assertRaises(RuntimeError, self._fail)
+        finally:
+            openbar.trace.end(context, 200)
+        work, failed, root = self.spans()
+        self.assertEqual(root['name'], 'GET /1.0/items/')
+        self.assertEqual((root['kind'], root['tags']['http.status_code']), ('SERVER', '200'))
+        self.assertNotIn('parentId', root)
+        self.assertEqual(work['name'], 'work')
+        self.assertEqual(work['kind'], 'CLIENT')
+        self.assertEqual(work['tags'], {'size': '3', 'rows': '42'})
+        self.assertEqual(failed['tags']['error'], 'RuntimeError')
+        for span in (work, failed):
+            self.assertEqual(span['traceId'], root['traceId'])
+            self.assertEqual(span['parentId'], root['id'])
+            self.assertEqual(span['localEndpoint'], {'serviceName': 'tests'})
+
+    def _fail(self):
+        with openbar.trace.span('failed'):
+            raise RuntimeError('boom')
+
+    def test_sampled_by_caller(self):
+        openbar.trace.configure(0.0, self.export)
+        unsampled = openbar.trace.begin({})
+        openbar.trace.end(unsampled)
+        context = openbar.trace.begin({'HTTP_TRACEPARENT': '00-%s-%s-01' % (_TRACE_ID, _PARENT_ID)})
+        openbar.trace.end(context)
+        root, = self.spans()
+        self.assertEqual((root['traceId'], root['parentId']), (_TRACE_ID, _PARENT_ID))
+
+    def test_no_export(self):
+        openbar.trace.configure(1.0, None)
+        context = openbar.trace.begin({'HTTP_TRACEPARENT': '00-%s-%s-01' % (_TRACE_ID, _PARENT_ID)})
+        try:
+            self.assertFalse(openbar.trace.recording())
+        finally:
+            openbar.trace.end(context)
+
+    def test_datagrams(self):
+        spans = [{'id': '%016x' % i, 'pad': 'x' * 1000} for i in range(200)]
+        datagrams = list(openbar.trace._Exporter._datagrams(spans))
+        self.assertGreater(len(datagrams), 1)
+        self.assertTrue(all(len(datagram) <= openbar.trace.DATAGRAM for datagram in datagrams))
+        self.assertEqual([span for datagram in datagrams for span in pyjson.loads(datagram)],
+                         spans)
@@ -0,0 +1,119 @@
+#
+# Copyright (c) 2026 agent <agent@local>
+#
+# Permission to use, copy, modify, and distribute this software for any
+# purpose with or without fee is hereby granted, provided that the above
+# copyright notice and this permission notice appear in all copies.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES
+# WITH REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF
+# MERCHANTABILITY AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR
+# ANY SPECIAL, DIRECT, INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES
+# WHATSOEVER RESULTING FROM LOSS OF USE, DATA OR PROFITS, WHETHER IN AN
+# ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
+# OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
+#
+"""
+tests of the wire formats
+"""
+
+import array
+import unittest
+import unittest.mock
+
+import bottle
+
+import openbar.params
+import openbar.wire
+
+from tests import request
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+_MSGPACK = 'application/msgpack'
+
+
+class JSONTest(unittest.TestCase):
+    def test_roundtrip(self):
+        data = {'a': [1, 2.5, None, 'caf\xe9'], 'b': {'c': True}}
+        self.assertEqual(openbar.wire.loads(openbar.wire.dumps(data)), data)
+        self.assertEqual(openbar.wire.loads('{"a": 1}'), {'a': 1})
+
+    def test_arrays(self):
+        data = {'ids': array.array('q', [1, 2, 3])}
+        self.assertEqual(openbar.wire.loads(openbar.wire.dumps(data)), {'ids': [1, 2, 3]})
+        self.assertRaises(TypeError, openbar.wire.dumps, {'set': set()})
+
+    def test_content_types(self):
+        self.assertTrue(openbar.wire.is_msgpack('application/msgpack'))
+        self.assertTrue(openbar.wire.is_msgpack('Application/X-MsgPack; charset=binary'))
+        self.assertFalse(openbar.wire.is_msgpack('application/json'))
+        self.assertFalse(openbar.wire.is_msgpack(None))
+
+    def test_negotiate_without_msgpack(self):
+        with unittest.mock.patch.object(openbar.wire, 'msgpack', None):
+            self.assertEqual(openbar.wire.negotiate(_MSGPACK), openbar.wire.JSON)
+            self.assertRaises(ValueError, openbar.wire.loads, b'\x80', _MSGPACK)
+
+
+@unittest.skipUnless(openbar.wire.available(), 'msgpack is not installed')
+class MsgpackTest(unittest.TestCase):
+    def test_negotiate(self):
+        negotiate = openbar.wire.negotiate
+        self.assertEqual(negotiate(None), openbar.wire.JSON)
+        self.assertEqual(negotiate('*/*'), openbar.wire.JSON)
+        self.assertEqual(negotiate('application/msgpack'), _MSGPACK)
+        self.assertEqual(negotiate('application/x-msgpack'), _MSGPACK)
+        self.assertEqual(negotiate('application/json, application/msgpack'), openbar.wire.JSON)
+        self.assertEqual(negotiate('application/json;q=0.5, application/msgpack'), _MSGPACK)
+        self.assertEqual(negotiate('application/msgpack;q=0.1, */*;q=0.2'), openbar.wire.JSON)
+        self.assertEqual(negotiate('application/msgpack;q=oops, text/html'), openbar.wire.JSON)
+
+    def test_roundtrip(self):
+        data = {'a': [1, 2.5, None, 'caf\xe9'], 'b': b'\x00\xff', 1: 'int key'}
+        self.assertEqual(openbar.wire.loads(openbar.wire.dumps(data, _MSGPACK), _MSGPACK), data)
+
+    def test_arrays(self):
+        for typecode in 'bBhHiIlLqQfd':
+            values = array.array(typecode, [0, 1, 2, 3])
+            decoded = openbar.wire.loads(openbar.wire.dumps([values], _MSGPACK), _MSGPACK)[0]
+            self.assertIsInstance(decoded, array.array)
+            self.assertEqual((decoded.typecode, decoded), (typecode, values))
+        # unicode arrays are not numeric, they travel as lists
+        packed = openbar.wire.dumps(array.array('u', 'ab'), _MSGPACK)
+        self.assertEqual(openbar.wire.loads(packed, _MSGPACK), ['a', 'b'])
+
+    def test_unknown_ext(self):
+        packed = msgpack.packb(msgpack.ExtType(42, b'data'))
+        self.assertEqual(openbar.wire.loads(packed, _MSGPACK), msgpack.ExtType(42, b'data'))
+
+    def test_invalid(self):
+        for payload in (msgpack.packb(msgpack.ExtType(1, b'')),
+                        msgpack.packb(msgpack.ExtType(1, b'u\x00\x00')),
+                        msgpack.packb(msgpack.ExtType(1, b'q\x00\x00\x00')),
+                        b'\xc1',
+                        b'\x92\x01',
+                        b'\x81\x90\x01'):
+            self.assertRaises(ValueError, openbar.wire.loads, payload, _MSGPACK)
+
+    def test_request_body(self):
+        app = bottle.Bottle()
+        app.install(openbar.params.WirePlugin())
+        @app.post('/')
+        def _post():
+            with openbar.params.json() as params:
+                return {'name': params.string('name')}
+
+        def call(payload):
+            return request(app, 'POST', '/', payload,
+                           headers={'Content-Type': _MSGPACK, 'Accept': _MSGPACK})
+
+        status, headers, body = call(msgpack.packb({'name': 'foo'}))
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['Content-Type'], _MSGPACK)
+        self.assertEqual(openbar.wire.loads(body, _MSGPACK), {'name': 'foo'})
+        self.assertEqual(call(b'\xc1')[0], 400)
+        self.assertEqual(call(msgpack.packb(msgpack.ExtType(1, b'')))[0], 400)